@@ -1,41 +1,40 @@
 # app.py
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify, Response, stream_with_context, g
 from werkzeug.utils import secure_filename
 import os
 import utils # Import our helper functions
-from models import db, TranslationLog
-import sys
-from gtts import gTTS
-import io
+from models import db, TranslationLog, TextBlob, intern_texts, migrate_schema
+from sqlalchemy.orm import aliased
+from log_writer import LogWriter, enable_sqlite_wal
+from log_retention import start_periodic_retention
+import base64
 from datetime import datetime
 import secrets
-import secrets
-from schemes_data import get_schemes, get_scheme_by_id, get_daily_schemes
+import json
+import threading
+from schemes_data import GOVERNMENT_SCHEMES, get_daily_schemes
+from scheme_repository import SchemeRepository
+from scheme_translations import SchemeTranslationStore
+from scheme_audio import SchemeAudioStore
+from jobs import JobQueue, JobQueueFull, validate_callback_url
+from stt_engines import MODEL_SIZES as STT_MODEL_SIZES
+from upload_io import upload_source
+import tts_engines
+from tts_engines import MASTER_TTS_CONFIG, USABLE_VOICES_BY_LANG, tts_code_for, resolve_tts_lang
+from tts_cache import TTSAudioCache, make_tts_key
+import metrics
+from metrics import time_stage
 
 # --- Configuration ---
-UPLOAD_FOLDER = 'uploads'
 INSTANCE_FOLDER = 'instance'
 ALLOWED_EXTENSIONS_IMG = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'}
 ALLOWED_EXTENSIONS_AUDIO = {'mp3', 'wav', 'ogg', 'flac', 'm4a'}
 
 app = Flask(__name__, instance_path=os.path.abspath(INSTANCE_FOLDER))
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False 
 
-for folder_name in [UPLOAD_FOLDER]:
-    abs_folder_path = os.path.join(app.root_path, folder_name)
-    if not os.path.exists(abs_folder_path):
-        try:
-            os.makedirs(abs_folder_path)
-        except OSError as e:
-            print(f"ERROR: Could not create directory '{abs_folder_path}': {e}")
-            sys.exit(1)
-    if not os.access(abs_folder_path, os.W_OK):
-        print(f"ERROR: Directory '{abs_folder_path}' is not writable.")
-        sys.exit(1)
-
 DATABASE_URI = f"sqlite:///{os.path.join(app.instance_path, 'translations.db')}"
 app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
 # print(f"Database URI: {DATABASE_URI}") # Less verbose
@@ -43,12 +42,75 @@ app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
 db.init_app(app)
 
 with app.app_context():
-    utils.initialize_models()
+    # An inference pool forks after load, so it needs every model in memory at import. Otherwise
+    # models load per MODEL_LOADING once the server starts serving (see start_serving_tasks).
+    if utils.INFERENCE_WORKERS > 0:
+        utils.initialize_models('eager')
+    # Fork inference workers (INFERENCE_WORKERS > 0) before any other thread starts.
+    utils.start_inference_pool()
+    enable_sqlite_wal(db.engine)
     db.create_all()
+    migrate_schema()
+    utils.init_translation_cache(os.path.join(app.instance_path, 'translations.db'))
+
+# Translation logs are written in bulk by a background thread instead of one commit per request
+LOG_WRITER = LogWriter(
+    app,
+    db,
+    TranslationLog,
+    flush_size=int(os.environ.get('LOG_FLUSH_SIZE', '64')),
+    flush_interval=float(os.environ.get('LOG_FLUSH_INTERVAL_MS', '500')) / 1000,
+    max_queued=int(os.environ.get('LOG_QUEUE_SIZE', '10000')),
+    intern_texts=intern_texts
+)
+metrics.register_queue('log_writer', LOG_WRITER.queue_depth)
+
+# Optional in-process retention (see log_retention.py; also runnable as a CLI / cron job)
+if float(os.environ.get('LOG_RETENTION_INTERVAL_HOURS', '0')) > 0:
+    start_periodic_retention(
+        float(os.environ['LOG_RETENTION_INTERVAL_HOURS']),
+        db_path=os.path.join(app.instance_path, 'translations.db'),
+        archive_dir=os.path.join(app.instance_path, 'log_archive')
+    )
 
-# Disable caching for development
+SCHEME_TRANSLATIONS = SchemeTranslationStore(os.path.join(app.instance_path, 'scheme_translations.json'))
+
+# Id/category/region/token indexes over the schemes; translated text is re-indexed as the store changes
+SCHEME_REPOSITORY = SchemeRepository(GOVERNMENT_SCHEMES, translations=SCHEME_TRANSLATIONS)
+
+# Pre-generated scheme speech (see scheme_audio.py); the build makes one TTS call per clip, so it is opt-in
+SCHEME_AUDIO = SchemeAudioStore(os.path.join(app.instance_path, 'scheme_audio'))
+
+_serving_tasks_started = False
+_serving_tasks_lock = threading.Lock()
+
+def start_serving_tasks():
+    """
+    Once per process: loads models per MODEL_LOADING (by default a background warm-up)
+    and starts the background scheme translation (and opt-in audio) builds.
+    Called when the server starts serving, not at import, so scripts that import app
+    (e.g. clear_history.py) do not start model work.
+    """
+    global _serving_tasks_started
+    with _serving_tasks_lock:
+        if _serving_tasks_started:
+            return
+        _serving_tasks_started = True
+    if utils.INFERENCE_WORKERS <= 0:
+        utils.initialize_models()
+    scheme_translations_build = None
+    if os.environ.get('PRECOMPUTE_SCHEME_TRANSLATIONS', '1') == '1':
+        scheme_translations_build = SCHEME_TRANSLATIONS.start_background_build()
+    if os.environ.get('PRECOMPUTE_SCHEME_AUDIO', '0') == '1':
+        SCHEME_AUDIO.start_background_build(after=scheme_translations_build, translations=SCHEME_TRANSLATIONS)
+
+# Disable caching for development; routes that serve cacheable content set g.cache_control instead
 @app.after_request
 def add_header(response):
+    cache_control = g.get('cache_control')
+    if cache_control:
+        response.headers['Cache-Control'] = cache_control
+        return response
     response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
     response.headers['Pragma'] = 'no-cache'
     response.headers['Expires'] = '-1'
@@ -60,12 +122,33 @@ import time
 def inject_cache_buster():
     return {'cache_buster': int(time.time())}
 
-MASTER_TTS_CONFIG = {
-    "asm_Beng": None, "ben_Beng": "bn", "guj_Gujr": "gu", "hin_Deva": "hi",
-    "kan_Knda": "kn", "mal_Mlym": "ml", "mar_Deva": "mr", "ory_Orya": None,
-    "pan_Guru": "pa", "tam_Taml": "ta", "tel_Telu": "te", "urd_Arab": "ur",
-    "eng_Latn": "en",
-}
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.before_request
+def ensure_serving_tasks():
+    # WSGI servers never run __main__; the first request starts the warm-up and builds instead
+    if not _serving_tasks_started:
+        start_serving_tasks()
+
+@app.after_request
+def record_request_metrics(response):
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=request.endpoint or 'unknown',
+            method=request.method,
+            status=str(response.status_code)
+        )
+    return response
+
+TTS_AUDIO_CACHE = TTSAudioCache(
+    os.path.join(app.instance_path, 'tts_cache'),
+    max_bytes=int(float(os.environ.get('TTS_CACHE_MAX_MB', '256')) * 1024 * 1024)
+)
+metrics.TTS_CACHE.set_function(lambda: {(name,): value for name, value in TTS_AUDIO_CACHE.stats().items() if name in ('hits', 'misses', 'evictions')})
 
 NLLB_TO_FRIENDLY_NAME = {v: k for k, v in utils.SUPPORTED_LANGUAGES.items()}
 NLLB_TO_FRIENDLY_NAME.update({v: k for k, v in utils.NLLB_SOURCE_LANG_CODES.items()})
@@ -91,6 +174,7 @@ def index_route():
         target_nllb_code = utils.SUPPORTED_LANGUAGES.get(selected_target_friendly_name)
 
         log_entry = TranslationLog()
+        log_entry.device_id = request.form.get('device_id') or None
         log_entry.target_language = target_nllb_code if target_nllb_code else "unknown_target"
         source_text_intermediate = None
         source_lang_detected_short = None
@@ -118,19 +202,19 @@ def index_route():
 
                 allowed_extensions = ALLOWED_EXTENSIONS_IMG if input_type == 'image' else ALLOWED_EXTENSIONS_AUDIO
                 if file and file.filename and allowed_file(file.filename, allowed_extensions):
-                    filename = secure_filename(file.filename)
-                    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                    file.save(filepath)
-
                     try:
+                        with upload_source(file, input_type) as source:
+                            if input_type == 'image':
+                                source_text_intermediate, detected_lang_ocr_short = utils.perform_ocr(source, request.form.get('ocr_lang', 'en'))
+                            else:
+                                stt_result_text, stt_detected_lang_short = utils.perform_stt(source, **_stt_options(request.form))
+
                         if input_type == 'image':
-                            source_text_intermediate, detected_lang_ocr_short = utils.perform_ocr(filepath)
-                            source_lang_detected_short = detected_lang_ocr_short if detected_lang_ocr_short in utils.NLLB_SOURCE_LANG_CODES.keys() else 'en'
+                            source_lang_detected_short = detected_lang_ocr_short if detected_lang_ocr_short in utils.ISO_TO_NLLB else 'en'
                         
                         elif input_type == 'audio':
-                            stt_result_text, stt_detected_lang_short = utils.perform_stt(filepath, lang_code_hint='hi')
                             source_text_intermediate = stt_result_text
-                            if stt_detected_lang_short in utils.NLLB_SOURCE_LANG_CODES:
+                            if stt_detected_lang_short in utils.ISO_TO_NLLB:
                                 source_lang_detected_short = stt_detected_lang_short
                             else:
                                 flash(f"Detected language '{stt_detected_lang_short}' from audio is not supported for translation. Defaulting to English.", "warning")
@@ -144,9 +228,6 @@ def index_route():
                         import traceback
                         traceback.print_exc()
                         raise proc_err
-                    finally:
-                        if os.path.exists(filepath):
-                            os.remove(filepath)
                 else:
                     file_ext = 'unknown'
                     if file.filename and '.' in file.filename:
@@ -157,7 +238,7 @@ def index_route():
 
             # --- Perform Translation ---
             if source_text_intermediate and source_lang_detected_short and target_nllb_code:
-                source_nllb_code = utils.NLLB_SOURCE_LANG_CODES.get(source_lang_detected_short)
+                source_nllb_code = utils.ISO_TO_NLLB.get(source_lang_detected_short)
                 detected_lang_nllb = source_nllb_code
 
                 if not source_nllb_code:
@@ -204,14 +285,19 @@ def index_route():
 
         try:
             if not log_entry.source_language: log_entry.source_language = "unknown_source"
-            db.session.add(log_entry)
-            db.session.commit()
+            LOG_WRITER.submit(log_entry)
         except Exception as db_err:
-            db.session.rollback()
-            print(f"Database Error during log commit: {db_err}")
+            print(f"Database Error during log submit: {db_err}")
             flash("Failed to save translation log to database.", "secondary")
-
-    recent_logs = TranslationLog.query.order_by(TranslationLog.timestamp.desc()).limit(10).all()
+            log_entry = None
+    else:
+        log_entry = None
+
+    # Full texts: the page shows them and its TTS reads them (previews belong to the history API)
+    recent_logs = TranslationLog.query.order_by(TranslationLog.timestamp.desc(), TranslationLog.id.desc()).limit(10).all()
+    # This request's log may still be queued in LOG_WRITER; show it on top either way
+    if log_entry is not None and log_entry.timestamp not in {log.timestamp for log in recent_logs}:
+        recent_logs = [log_entry] + recent_logs[:9]
     from zoneinfo import ZoneInfo
     for log in recent_logs:
         if getattr(log, 'timestamp', None):
@@ -221,7 +307,7 @@ def index_route():
 
     selected_nllb_for_main_result = utils.SUPPORTED_LANGUAGES.get(selected_target_friendly_name)
     if selected_nllb_for_main_result:
-        tts_code_for_main = MASTER_TTS_CONFIG.get(selected_nllb_for_main_result)
+        tts_code_for_main = tts_code_for(selected_nllb_for_main_result)
         if tts_code_for_main:
             main_result_tts_supported = True
             main_result_tts_code = tts_code_for_main
@@ -242,34 +328,166 @@ def index_route():
         main_result_tts_code=main_result_tts_code,
         recent_logs=recent_logs,
         MASTER_TTS_CONFIG=MASTER_TTS_CONFIG,
+        tts_code_for=tts_code_for,
+        usable_tts_langs=sorted(USABLE_VOICES_BY_LANG),
         NLLB_TO_FRIENDLY_NAME=NLLB_TO_FRIENDLY_NAME,
         current_year=datetime.now().year,
     )
 
-@app.route('/tts', methods=['POST'])
+_TTS_UPGRADES = set() # Cache keys with a preferred-voice synthesis running in the background
+_TTS_UPGRADES_LOCK = threading.Lock()
+
+def _stored_tts_clip(key):
+    """(path, mimetype) of a pre-built scheme clip or a cached clip for the key, else None."""
+    clip = SCHEME_AUDIO.find(key)
+    clip_path = SCHEME_AUDIO.clip_path(clip) if clip else None
+    if clip_path:
+        return clip_path, SCHEME_AUDIO.clip_mimetype(clip)
+    cached = TTS_AUDIO_CACHE.get(key)
+    return (cached[0], cached[1]) if cached else None
+
+def _upgrade_tts_clip(text, tts_lang_code, preferred_voices):
+    """
+    Re-synthesizes a text that was served from a fallback voice with the voices
+    preferred over it, off the request path; the next request finds that clip first.
+    Skipped while those engines are cooling down after a failure.
+    """
+    if all(tts_engines.cooling_down(engine_name) for engine_name, _ in preferred_voices):
+        return
+    upgrade_key = make_tts_key(text, tts_lang_code, *preferred_voices[0])
+    with _TTS_UPGRADES_LOCK:
+        if upgrade_key in _TTS_UPGRADES:
+            return
+        _TTS_UPGRADES.add(upgrade_key)
+
+    def run():
+        try:
+            audio, extension, _, engine_name = tts_engines.synthesize(text, preferred_voices)
+            key = make_tts_key(text, tts_lang_code, engine_name, dict(preferred_voices)[engine_name])
+            TTS_AUDIO_CACHE.put(key, audio, extension)
+            app.logger.debug(f"TTS clip for lang '{tts_lang_code}' upgraded to {engine_name}")
+        except RuntimeError as e:
+            app.logger.debug(f"TTS upgrade for lang '{tts_lang_code}' failed: {e}")
+        finally:
+            with _TTS_UPGRADES_LOCK:
+                _TTS_UPGRADES.discard(upgrade_key)
+
+    threading.Thread(target=run, daemon=True, name='tts-upgrade').start()
+
+def synthesize_tts(text, tts_lang_code):
+    """
+    Returns (path, mimetype, cache_key) for the spoken text. Stored and cached
+    clips of every usable voice are checked before anything is synthesized; a
+    clip from a fallback voice is served and replaced in the background. Only if
+    no voice has a clip is the text synthesized, by the first engine that works.
+    """
+    voices = USABLE_VOICES_BY_LANG[tts_lang_code]
+    keys = [make_tts_key(text, tts_lang_code, engine_name, voice) for engine_name, voice in voices]
+    for i, key in enumerate(keys):
+        stored = _stored_tts_clip(key)
+        if stored:
+            if i > 0:
+                _upgrade_tts_clip(text, tts_lang_code, voices[:i])
+            return stored[0], stored[1], key
+
+    with time_stage('tts'):
+        audio, extension, _, engine_name = tts_engines.synthesize(text, voices)
+    key = keys[[name for name, _ in voices].index(engine_name)]
+    path, mimetype = TTS_AUDIO_CACHE.put(key, audio, extension)
+    app.logger.debug(f"TTS synthesized with {engine_name} for lang '{tts_lang_code}' ({len(audio)} bytes)")
+    return path, mimetype, key
+
+@app.route('/tts', methods=['GET', 'POST'])
 def tts_route():
-    text = request.form.get('text')
-    tts_lang_code = request.form.get('lang', 'en')
+    # GET lets <audio src=...> stream with Range requests and revalidate with the ETag
+    params = request.form if request.method == 'POST' else request.args
+    text = params.get('text')
+    tts_lang_code = params.get('lang', 'en')
 
     if not text: return "Missing text for TTS", 400
     if not tts_lang_code: return "Missing language code for TTS", 400
+    requested_lang_code = tts_lang_code
+    # Languages no enabled engine can speak fall back to the English voice
+    tts_lang_code = resolve_tts_lang(tts_lang_code)
+    if not tts_lang_code: return f"TTS is not available for language '{requested_lang_code}'", 400
 
-    # print(f"TTS Route Request: Text='{text[:50]}...', Lang='{tts_lang_code}'") # Already good
     try:
-        gtts_instance = gTTS(text=text, lang=tts_lang_code, slow=False)
-        fp = io.BytesIO()
-        gtts_instance.write_to_fp(fp)
-        fp.seek(0)
-        # print(f"gTTS audio generated successfully for lang: {tts_lang_code}") # Already good
-        return send_file(fp, mimetype='audio/mpeg')
+        path, mimetype, key = synthesize_tts(text, tts_lang_code)
+        # Same text and language always map to the same clip, so the key is a strong ETag
+        g.cache_control = 'private, no-cache'
+        return send_file(path, mimetype=mimetype, conditional=True, etag=key)
     except Exception as e:
-        print(f"gTTS generation failed for lang '{tts_lang_code}': {e}") # Already good
+        print(f"TTS generation failed for lang '{tts_lang_code}': {e}")
         import traceback
-        traceback.print_exc() # Already good
-        return f"TTS generation failed for gTTS with language '{tts_lang_code}': {e}", 500
+        traceback.print_exc()
+        return f"TTS generation failed for language '{tts_lang_code}': {e}", 500
+
+@app.route('/scheme-audio/<clip>', methods=['GET'])
+def scheme_audio_route(clip):
+    """Serves a pre-generated scheme clip; names are content hashes, so they never change"""
+    path = SCHEME_AUDIO.clip_path(clip)
+    if not path:
+        return "Audio clip not found", 404
+    g.cache_control = 'public, max-age=31536000, immutable'
+    return send_file(path, mimetype=SCHEME_AUDIO.clip_mimetype(clip), conditional=True, etag=clip.split('.')[0])
+
+def _scheme_audio_urls(scheme_id, language=None):
+    """{nllb_code: {field: url}} (or one language's {field: url}) for a scheme's pre-generated clips"""
+    def urls(fields):
+        return {field: url_for('scheme_audio_route', clip=clip) for field, clip in fields.items()}
+    if language:
+        return urls(SCHEME_AUDIO.get_clips(scheme_id, language))
+    return {lang: urls(fields) for lang, fields in SCHEME_AUDIO.get_clips(scheme_id).items()}
+
+@app.route('/api/tts/cache', methods=['GET'])
+def tts_cache_stats_route():
+    """Hit/miss counters and size of the TTS audio cache"""
+    return jsonify({'success': True, 'cache': TTS_AUDIO_CACHE.stats(), 'engines': tts_engines.TTS_ENGINE_ORDER})
 
 # --- New API Routes for Enhanced Features ---
 
+@app.route('/metrics', methods=['GET'])
+def metrics_route():
+    """Prometheus text-exposition of stage timings, cache counters and queue depths"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_route():
+    """Readiness probe: which engines are loaded (503 if a required one is not)"""
+    status = utils.get_model_status()
+    required = [name.strip() for name in request.args.get('require', '').split(',') if name.strip()]
+    missing = [name for name in required if not status['engines'].get(name)]
+    return jsonify({
+        'success': not missing,
+        'ready': not missing,
+        'missing': missing,
+        **status
+    }), (503 if missing else 200)
+
+@app.route('/api/schemes', methods=['GET'])
+def search_schemes_route():
+    """Filter (?category=, ?region=) and search (?q=, over translations too; ?lang= narrows to one language) schemes"""
+    limit = request.args.get('limit', 20, type=int)
+    offset = max(0, request.args.get('offset', 0, type=int))
+    language = request.args.get('lang')
+    schemes, total = SCHEME_REPOSITORY.query(
+        q=request.args.get('q'),
+        category=request.args.get('category'),
+        region=request.args.get('region'),
+        language=language,
+        limit=max(1, min(limit, 100)),
+        offset=offset
+    )
+    return jsonify({
+        'schemes': schemes,
+        'success': True,
+        'count': len(schemes),
+        'total': total,
+        'offset': offset,
+        'language': language,
+        'facets': {'categories': SCHEME_REPOSITORY.categories, 'regions': SCHEME_REPOSITORY.regions}
+    })
+
 @app.route('/api/schemes/daily', methods=['GET'])
 def get_daily_schemes_route():
     """Get schemes for daily display (rotates based on date)"""
@@ -281,24 +499,33 @@ def get_daily_schemes_route():
 def get_all_schemes_route():
     """Get all available government schemes"""
     limit = request.args.get('limit', 20, type=int)
-    schemes = get_schemes(limit=limit)
+    schemes = SCHEME_REPOSITORY.all(limit=limit)
     return jsonify({'schemes': schemes, 'success': True, 'count': len(schemes)})
 
 @app.route('/api/schemes/<scheme_id>', methods=['GET'])
 def get_scheme_detail_route(scheme_id):
     """Get detailed information about a specific scheme"""
-    scheme = get_scheme_by_id(scheme_id)
+    scheme = SCHEME_REPOSITORY.get(scheme_id)
     if scheme:
         return jsonify({'scheme': scheme, 'success': True})
     return jsonify({'success': False, 'error': 'Scheme not found'}), 404
 
+@app.route('/api/schemes/<scheme_id>/audio', methods=['GET'])
+def get_scheme_audio_route(scheme_id):
+    """URLs of the pre-generated clips for a scheme (?lang= takes a friendly name or NLLB code)"""
+    if not SCHEME_REPOSITORY.get(scheme_id):
+        return jsonify({'success': False, 'error': 'Scheme not found'}), 404
+    language = request.args.get('lang')
+    nllb_code = utils.SUPPORTED_LANGUAGES.get(language, language) if language else None
+    return jsonify({'success': True, 'scheme_id': scheme_id, 'language': nllb_code, 'audio': _scheme_audio_urls(scheme_id, nllb_code)})
+
 @app.route('/api/schemes/all-with-translations', methods=['GET'])
 def get_all_schemes_with_translations():
-    """Get all schemes - returns English only, frontend handles caching and translation"""
+    """Get all schemes with their precomputed translations (optionally for one language)"""
     limit = request.args.get('limit', 20, type=int)
-    schemes = get_schemes(limit=limit)
+    language = request.args.get('lang')
+    schemes = SCHEME_REPOSITORY.all(limit=limit)
     
-    # Return schemes in a format optimized for frontend caching
     schemes_data = []
     for scheme in schemes:
         schemes_data.append({
@@ -308,13 +535,17 @@ def get_all_schemes_with_translations():
             'category': scheme['category'],
             'officialLink': scheme['officialLink'],
             'fullName': scheme['fullName'],
-            'summary': scheme['summary']
+            'summary': scheme['summary'],
+            'lastUpdated': scheme.get('lastUpdated'),
+            'translations': SCHEME_TRANSLATIONS.get_translations(scheme['id'], language),
+            'audio': _scheme_audio_urls(scheme['id'], utils.SUPPORTED_LANGUAGES.get(language, language) if language else None)
         })
     
     return jsonify({
         'schemes': schemes_data,
         'success': True,
-        'count': len(schemes_data)
+        'count': len(schemes_data),
+        'language': language
     })
 
 @app.route('/api/translate/instant', methods=['POST'])
@@ -342,7 +573,7 @@ def instant_translate_route():
         if translation_result:
             # Get TTS code for audio support
             target_nllb_code = utils.SUPPORTED_LANGUAGES.get(target_friendly_name)
-            tts_code = MASTER_TTS_CONFIG.get(target_nllb_code) if target_nllb_code else None
+            tts_code = tts_code_for(target_nllb_code)
             
             return jsonify({
                 'success': True,
@@ -358,126 +589,412 @@ def instant_translate_route():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@app.route('/api/translate/stream', methods=['GET', 'POST'])
+def stream_translate_route():
+    """Stream translated segments to the browser as Server-Sent Events"""
+    data = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+    text = (data.get('text') or '').strip()
+    source_lang_short = data.get('source_lang', 'en')
+    target_friendly_name = data.get('target_lang', 'Hindi')
+
+    if not text:
+        return jsonify({'success': False, 'error': 'No text provided'}), 400
+    if target_friendly_name not in utils.SUPPORTED_LANGUAGES:
+        return jsonify({'success': False, 'error': f"Unsupported target language '{target_friendly_name}'"}), 400
+
+    target_nllb_code = utils.SUPPORTED_LANGUAGES.get(target_friendly_name)
+    tts_code = tts_code_for(target_nllb_code)
+
+    def generate():
+        pieces = []
+        try:
+            for segment in utils.iter_translation_segments(text, source_lang_short, target_friendly_name):
+                pieces.append(segment['translation'] + segment['separator'])
+                yield _sse_event('segment', segment)
+        except Exception as e:
+            yield _sse_event('error', {'success': False, 'error': str(e)})
+            return
+        yield _sse_event('done', {
+            'success': True,
+            'translated_text': ''.join(pieces).strip(),
+            'source_lang': source_lang_short,
+            'target_lang': target_friendly_name,
+            'tts_supported': tts_code is not None,
+            'tts_code': tts_code
+        })
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/logs/writer', methods=['GET'])
+def log_writer_stats_route():
+    """Queue depth and write counters of the background translation log writer"""
+    return jsonify({'success': True, 'writer': LOG_WRITER.stats()})
+
+@app.route('/api/translate/cache', methods=['GET'])
+def translation_cache_stats_route():
+    """Hit/miss counters for the translation cache"""
+    return jsonify({'success': True, 'cache': utils.get_translation_cache().stats()})
+
+MAX_BATCH_TEXTS = 200
+
+@app.route('/api/translate/batch', methods=['POST'])
+def batch_translate_route():
+    """Translate many texts into many target languages in a single request"""
+    data = request.get_json(silent=True) or {}
+    texts = data.get('texts')
+    target_langs = data.get('target_langs') or ([data['target_lang']] if data.get('target_lang') else None)
+    source_lang_short = data.get('source_lang', 'en')
+
+    if not isinstance(texts, list) or not texts:
+        return jsonify({'success': False, 'error': 'texts must be a non-empty list'}), 400
+    if not isinstance(target_langs, list) or not target_langs:
+        return jsonify({'success': False, 'error': 'target_langs must be a non-empty list'}), 400
+    if len(texts) > MAX_BATCH_TEXTS:
+        return jsonify({'success': False, 'error': f'At most {MAX_BATCH_TEXTS} texts per request'}), 400
+
+    if not all(t is None or isinstance(t, str) for t in texts):
+        return jsonify({'success': False, 'error': 'texts must be a list of strings (or null)'}), 400
+    if not all(isinstance(name, str) for name in target_langs):
+        return jsonify({'success': False, 'error': 'target_langs must be a list of language names'}), 400
+    if not isinstance(source_lang_short, str):
+        return jsonify({'success': False, 'error': 'source_lang must be a language code'}), 400
+
+    unknown_targets = [name for name in target_langs if name not in utils.SUPPORTED_LANGUAGES]
+    if unknown_targets:
+        return jsonify({'success': False, 'error': f'Unsupported target languages: {unknown_targets}'}), 400
+
+    texts = [t.strip() if t is not None else '' for t in texts]
+    # De-duplicate targets while keeping the caller's order
+    target_langs = list(dict.fromkeys(target_langs))
+
+    try:
+        batch_results = utils.translate_many(texts, source_lang_short, target_langs)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+    results = {}
+    failed = 0
+    for target_friendly_name, pairs in batch_results.items():
+        target_nllb_code = utils.SUPPORTED_LANGUAGES.get(target_friendly_name)
+        tts_code = tts_code_for(target_nllb_code)
+        errors = [err for _, err in pairs]
+        failed += sum(1 for err in errors if err)
+        results[target_friendly_name] = {
+            'translations': [translated for translated, _ in pairs],
+            'errors': errors,
+            'tts_supported': tts_code is not None,
+            'tts_code': tts_code
+        }
+
+    return jsonify({
+        'success': failed == 0,
+        'source_lang': source_lang_short,
+        'count': len(texts),
+        'failed': failed,
+        'results': results
+    })
+
+HISTORY_PREVIEW_CHARS = 100
+MAX_HISTORY_PAGE = 100
+
+def _history_preview_query():
+    """
+    Log rows for history views: only the columns they show, with the texts
+    truncated in SQL; each text is one primary-key lookup into text_blob.
+    """
+    original_blob = aliased(TextBlob)
+    translated_blob = aliased(TextBlob)
+    return db.session.query(
+        TranslationLog.id,
+        TranslationLog.input_type,
+        TranslationLog.source_language,
+        TranslationLog.target_language,
+        db.func.substr(original_blob.text, 1, HISTORY_PREVIEW_CHARS).label('original_text'),
+        db.func.substr(translated_blob.text, 1, HISTORY_PREVIEW_CHARS).label('translated_text'),
+        TranslationLog.timestamp,
+        TranslationLog.error_message
+    ).outerjoin(
+        original_blob, original_blob.hash == TranslationLog.original_text_hash
+    ).outerjoin(
+        translated_blob, translated_blob.hash == TranslationLog.translated_text_hash
+    )
+
+def _encode_history_cursor(timestamp, log_id):
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{log_id}".encode()).decode().rstrip('=')
+
+def _decode_history_cursor(cursor):
+    """Returns (timestamp, id) from an opaque cursor; raises ValueError if malformed."""
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    timestamp, log_id = raw.split('|', 1)
+    return datetime.fromisoformat(timestamp), int(log_id)
+
 @app.route('/api/history/device', methods=['GET'])
 def get_device_history_route():
-    """Get translation history for a specific device"""
+    """
+    Get translation history for a specific device, newest first.
+    Keyset pagination: pass the returned next_cursor as ?cursor= for the next page;
+    each page is one range scan of ix_translation_log_device_timestamp.
+    """
     device_id = request.args.get('device_id')
-    limit = request.args.get('limit', 10, type=int)
+    limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_HISTORY_PAGE)
+    cursor = request.args.get('cursor')
     
     if not device_id:
         return jsonify({'success': False, 'error': 'Device ID required'}), 400
     
     try:
-        # For now, return all recent logs
-        # In a production app, you'd store device_id in TranslationLog model
-        recent_logs = TranslationLog.query.order_by(
-            TranslationLog.timestamp.desc()
-        ).limit(limit).all()
+        query = _history_preview_query().filter(TranslationLog.device_id == device_id)
+        
+        if cursor:
+            try:
+                cursor_timestamp, cursor_id = _decode_history_cursor(cursor)
+            except (ValueError, UnicodeDecodeError):
+                return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+            query = query.filter(db.or_(
+                TranslationLog.timestamp < cursor_timestamp,
+                db.and_(TranslationLog.timestamp == cursor_timestamp, TranslationLog.id < cursor_id)
+            ))
+        
+        # Fetch one extra row to know whether another page exists
+        rows = query.order_by(TranslationLog.timestamp.desc(), TranslationLog.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         logs_data = []
-        for log in recent_logs:
+        for log in rows:
             logs_data.append({
                 'id': log.id,
                 'input_type': log.input_type,
                 'source_language': log.source_language,
                 'target_language': log.target_language,
-                'original_text': log.original_text[:100] if log.original_text else '',
-                'translated_text': log.translated_text[:100] if log.translated_text else '',
+                'original_text': log.original_text or '',
+                'translated_text': log.translated_text or '',
                 'timestamp': log.timestamp.isoformat() if log.timestamp else None,
                 'error_message': log.error_message
             })
         
+        next_cursor = None
+        if has_more and rows[-1].timestamp:
+            next_cursor = _encode_history_cursor(rows[-1].timestamp, rows[-1].id)
+        
         return jsonify({
             'success': True,
             'logs': logs_data,
             'count': len(logs_data),
-            'device_id': device_id
+            'device_id': device_id,
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _stt_options(form):
+    """
+    Optional per-request STT knobs: stt_model_size (tiny/base/small) or
+    latency_budget_ms, from which perform_stt picks the largest model that fits.
+    """
+    options = {}
+    model_size = form.get('stt_model_size')
+    if model_size in STT_MODEL_SIZES:
+        options['model_size'] = model_size
+    latency_budget_ms = form.get('latency_budget_ms', type=int)
+    if latency_budget_ms and latency_budget_ms > 0:
+        options['latency_budget_ms'] = latency_budget_ms
+    return options
+
+def _translate_file(upload, input_type, target_friendly_name, ocr_lang='en', stt_options=None, filename=None, device_id=None):
+    """
+    Runs OCR/STT on an upload (FileStorage or bytes), translates the text and logs it.
+    Returns:
+        tuple: (response_dict, http_status)
+    """
+    source_text = None
+    source_lang_detected = 'en'
+    
+    with upload_source(upload, input_type, filename) as source:
+        if input_type == 'image':
+            source_text, detected_lang = utils.perform_ocr(source, ocr_lang)
+            # Non-Devanagari scripts are translatable sources too once OCR can read them
+            source_lang_detected = detected_lang if detected_lang in utils.ISO_TO_NLLB else 'en'
+        elif input_type == 'audio':
+            # Whisper detects the spoken language from the first voiced window
+            source_text, detected_lang = utils.perform_stt(source, **(stt_options or {}))
+            source_lang_detected = detected_lang if detected_lang in utils.ISO_TO_NLLB else 'en'
+    
+    if not source_text:
+        return {'success': False, 'error': f'Could not extract text from {input_type}'}, 500
+    
+    # Translate the extracted text
+    translation_result, trans_error = utils.translate_text(
+        source_text,
+        source_lang_detected,
+        target_friendly_name
+    )
+    
+    if trans_error:
+        return {'success': False, 'error': trans_error}, 500
+    
+    # Log the translation
+    log_entry = TranslationLog()
+    log_entry.input_type = 'ocr' if input_type == 'image' else 'audio'
+    log_entry.device_id = device_id
+    log_entry.source_language = utils.ISO_TO_NLLB.get(source_lang_detected)
+    log_entry.target_language = utils.SUPPORTED_LANGUAGES.get(target_friendly_name)
+    log_entry.original_text = source_text
+    log_entry.translated_text = translation_result
+    LOG_WRITER.submit(log_entry)
+    
+    # Get TTS info
+    target_nllb_code = utils.SUPPORTED_LANGUAGES.get(target_friendly_name)
+    tts_code = tts_code_for(target_nllb_code)
+    
+    return {
+        'success': True,
+        'original_text': source_text,
+        'translated_text': translation_result,
+        'source_lang': source_lang_detected,
+        'target_lang': target_friendly_name,
+        'tts_supported': tts_code is not None,
+        'tts_code': tts_code
+    }, 200
+
+def _validate_file_upload():
+    """
+    Validates the multipart upload shared by the instant and job file routes.
+    Returns:
+        tuple: (file, input_type, error_response) - error_response is None when valid.
+    """
+    if 'file' not in request.files:
+        return None, None, (jsonify({'success': False, 'error': 'No file provided'}), 400)
+    
+    file = request.files['file']
+    input_type = request.form.get('input_type', 'image')
+    
+    if not file or not file.filename:
+        return None, None, (jsonify({'success': False, 'error': 'No file selected'}), 400)
+    
+    allowed_extensions = ALLOWED_EXTENSIONS_IMG if input_type == 'image' else ALLOWED_EXTENSIONS_AUDIO
+    
+    if not allowed_file(file.filename, allowed_extensions):
+        return None, None, (jsonify({'success': False, 'error': 'Invalid file type'}), 400)
+    
+    return file, input_type, None
+
 @app.route('/api/translate/file', methods=['POST'])
 def translate_file_instant_route():
     """Handle instant file translation (OCR/STT) without page reload"""
     try:
-        if 'file' not in request.files:
-            return jsonify({'success': False, 'error': 'No file provided'}), 400
-        
-        file = request.files['file']
-        input_type = request.form.get('input_type', 'image')
+        file, input_type, error_response = _validate_file_upload()
+        if error_response:
+            return error_response
         target_friendly_name = request.form.get('target_language', 'Hindi')
-        device_id = request.form.get('device_id', 'unknown')
-        
-        if not file or not file.filename:
-            return jsonify({'success': False, 'error': 'No file selected'}), 400
-        
-        allowed_extensions = ALLOWED_EXTENSIONS_IMG if input_type == 'image' else ALLOWED_EXTENSIONS_AUDIO
-        
-        if not allowed_file(file.filename, allowed_extensions):
-            return jsonify({'success': False, 'error': 'Invalid file type'}), 400
+        device_id = request.form.get('device_id') or None
         
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        try:
-            source_text = None
-            source_lang_detected = 'en'
-            
-            if input_type == 'image':
-                source_text, detected_lang = utils.perform_ocr(filepath)
-                source_lang_detected = detected_lang if detected_lang in utils.NLLB_SOURCE_LANG_CODES.keys() else 'en'
-            elif input_type == 'audio':
-                source_text, detected_lang = utils.perform_stt(filepath, lang_code_hint='hi')
-                source_lang_detected = detected_lang if detected_lang in utils.NLLB_SOURCE_LANG_CODES else 'en'
-            
-            if not source_text:
-                return jsonify({'success': False, 'error': f'Could not extract text from {input_type}'}), 500
-            
-            # Translate the extracted text
-            translation_result, trans_error = utils.translate_text(
-                source_text,
-                source_lang_detected,
-                target_friendly_name
-            )
-            
-            if trans_error:
-                return jsonify({'success': False, 'error': trans_error}), 500
-            
-            # Log the translation
-            log_entry = TranslationLog()
-            log_entry.input_type = 'ocr' if input_type == 'image' else 'audio'
-            log_entry.source_language = utils.NLLB_SOURCE_LANG_CODES.get(source_lang_detected)
-            log_entry.target_language = utils.SUPPORTED_LANGUAGES.get(target_friendly_name)
-            log_entry.original_text = source_text
-            log_entry.translated_text = translation_result
-            db.session.add(log_entry)
-            db.session.commit()
-            
-            # Get TTS info
-            target_nllb_code = utils.SUPPORTED_LANGUAGES.get(target_friendly_name)
-            tts_code = MASTER_TTS_CONFIG.get(target_nllb_code) if target_nllb_code else None
-            
-            return jsonify({
-                'success': True,
-                'original_text': source_text,
-                'translated_text': translation_result,
-                'source_lang': source_lang_detected,
-                'target_lang': target_friendly_name,
-                'tts_supported': tts_code is not None,
-                'tts_code': tts_code,
-                'log_id': log_entry.id
-            })
-            
-        finally:
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                
+        payload, status = _translate_file(file, input_type, target_friendly_name, request.form.get('ocr_lang', 'en'), _stt_options(request.form), device_id=device_id)
+        return jsonify(payload), status
+
+    except ValueError as ve:
+        # e.g. an upload that is not a decodable image
+        return jsonify({'success': False, 'error': str(ve)}), 400
     except Exception as e:
         import traceback
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# --- Background jobs for OCR/STT uploads ---
+
+def _run_file_job(job):
+    """JobQueue handler: processes the upload bytes held by the job (spilled to disk only if large)."""
+    with app.app_context():
+        payload, status = _translate_file(job.payload, job.kind, job.params['target_language'], job.params['ocr_lang'], job.params.get('stt_options'), job.params['filename'], job.params.get('device_id'))
+    if not payload.get('success'):
+        raise Exception(payload.get('error', 'File translation failed'))
+    return payload
+
+FILE_JOBS = JobQueue(
+    _run_file_job,
+    workers=int(os.environ.get('JOB_WORKERS', '2')),
+    max_queued=int(os.environ.get('JOB_QUEUE_SIZE', '16')),
+    result_ttl=int(os.environ.get('JOB_RESULT_TTL', '3600')),
+)
+
+metrics.register_queue('file_jobs', FILE_JOBS.queue_depth)
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_file_job_route():
+    """Queue an OCR/STT translation job and return its id immediately"""
+    file, input_type, error_response = _validate_file_upload()
+    if error_response:
+        return error_response
+    target_friendly_name = request.form.get('target_language', 'Hindi')
+    if target_friendly_name not in utils.SUPPORTED_LANGUAGES:
+        return jsonify({'success': False, 'error': f"Unsupported target language '{target_friendly_name}'"}), 400
+
+    callback_url = request.form.get('callback_url') or None
+    if callback_url:
+        try:
+            validate_callback_url(callback_url)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+    try:
+        job = FILE_JOBS.submit(
+            input_type,
+            file.read(),
+            params={
+                'filename': secure_filename(file.filename),
+                'target_language': target_friendly_name,
+                'ocr_lang': request.form.get('ocr_lang', 'en'),
+                'stt_options': _stt_options(request.form),
+                'device_id': request.form.get('device_id') or None
+            },
+            callback_url=callback_url
+        )
+    except JobQueueFull as e:
+        response = jsonify({'success': False, 'error': str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('get_file_job_route', job_id=job.id),
+        'result_url': url_for('get_file_job_result_route', job_id=job.id)
+    }), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_file_job_route(job_id):
+    """Poll the status of a queued job"""
+    job = FILE_JOBS.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_file_job_result_route(job_id):
+    """Fetch the result of a finished job (202 while it is still pending)"""
+    job = FILE_JOBS.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if not job.finished:
+        return jsonify({'success': True, 'job': job.to_dict()}), 202
+    if job.status == 'failed':
+        return jsonify({'success': False, 'error': job.error, 'job': job.to_dict()}), 500
+    return jsonify(dict(job.result, job=job.to_dict()))
+
+@app.route('/api/jobs', methods=['GET'])
+def file_job_stats_route():
+    """Queue depth and job counts"""
+    return jsonify({'success': True, 'jobs': FILE_JOBS.stats(), 'queue_depth': FILE_JOBS.queue_depth()})
+
 if __name__ == "__main__":
+    # With the debug reloader only the serving child (WERKZEUG_RUN_MAIN) loads models and starts the builds
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_serving_tasks()
     app.run(host="0.0.0.0", port=5001, debug=True)
\ No newline at end of file
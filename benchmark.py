@@ -0,0 +1,401 @@
+# benchmark.py - Latency/throughput benchmark for the translation, OCR and STT hot paths
+#
+# Usage:
+#   python benchmark.py --stages translate ocr stt --concurrency 1 4 8 --batch-sizes 1 8 16 --output bench.json
+#   python benchmark.py --stages translate --compare bench.json      # exit code 1 on regression
+#   python benchmark.py --stages ocr --ocr-variants raw preprocessed # OCR latency vs accuracy
+import argparse
+import difflib
+import json
+import math
+import os
+import platform
+import random
+import resource
+import struct
+import sys
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import utils
+from schemes_data import GOVERNMENT_SCHEMES
+
+SEED = 1234
+WORDS = (
+    "farmers scheme support income crop insurance credit card soil health solar pump subsidy "
+    "installment bank account land records application office village district government "
+    "interest premium harvest seeds fertilizer irrigation water market price loan benefit"
+).split()
+
+
+class _NullCache:
+    """Disables the translation cache so every request reaches the model."""
+
+    def get(self, *args):
+        return None
+
+    def put(self, *args):
+        pass
+
+    def stats(self):
+        # Same keys as TranslationCache.stats(), so metrics callbacks keep working
+        return {
+            'memory_hits': 0,
+            'db_hits': 0,
+            'misses': 0,
+            'puts': 0,
+            'memory_evictions': 0,
+            'db_evictions': 0,
+            'memory_entries': 0,
+            'hit_rate': 0.0,
+            'max_memory_entries': 0,
+            'max_db_entries': 0,
+        }
+
+
+# --- Fixed local corpus ---
+
+def build_text_corpus(size=64, seed=SEED):
+    """Scheme summaries plus seeded synthetic sentences of varied length."""
+    rng = random.Random(seed)
+    corpus = [scheme['summary'] for scheme in GOVERNMENT_SCHEMES]
+    while len(corpus) < size:
+        sentences = []
+        for _ in range(rng.randint(1, 4)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(6, 24))]
+            sentences.append(' '.join(words).capitalize() + '.')
+        corpus.append(' '.join(sentences))
+    return corpus[:size]
+
+
+def build_image_corpus(directory, count=8, seed=SEED):
+    """
+    Renders corpus sentences onto white images of a few sizes, including phone-sized
+    photos; every third one is a JPEG stored sideways with an EXIF rotation tag.
+    Returns:
+        tuple: (paths, rendered texts)
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = random.Random(seed)
+    texts = build_text_corpus(count, seed)
+    paths = []
+    for index, text in enumerate(texts):
+        width, height = rng.choice([(800, 600), (1600, 1200), (3000, 4000)])
+        image = Image.new('RGB', (width, height), 'white')
+        draw = ImageDraw.Draw(image)
+        try:
+            font = ImageFont.truetype("DejaVuSans.ttf", max(16, width // 40))
+        except OSError:
+            font = ImageFont.load_default()
+        y = height // 10
+        line = []
+        for word in text.split():
+            line.append(word)
+            if len(line) >= 8:
+                draw.text((width // 20, y), ' '.join(line), fill='black', font=font)
+                y += max(20, width // 25)
+                line = []
+        if line:
+            draw.text((width // 20, y), ' '.join(line), fill='black', font=font)
+        if index % 3 == 2:
+            path = os.path.join(directory, f"bench_{index}.jpg")
+            exif = Image.Exif()
+            exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise to display
+            image.rotate(90, expand=True).save(path, quality=90, exif=exif)
+        else:
+            path = os.path.join(directory, f"bench_{index}.png")
+            image.save(path)
+        paths.append(path)
+    return paths, texts
+
+
+def build_audio_corpus(directory, count=4, seed=SEED, sample_rate=16000):
+    """Writes 16 kHz mono WAVs of modulated tones separated by silence, 5-60 s long."""
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        seconds = rng.choice([5, 15, 30, 60])
+        frames = bytearray()
+        for n in range(seconds * sample_rate):
+            t = n / sample_rate
+            voiced = int(t * 2) % 3 != 2  # Two voiced half-seconds, then a silent one
+            sample = 0.3 * math.sin(2 * math.pi * (180 + 40 * math.sin(3 * t)) * t) if voiced else 0.0
+            frames += struct.pack('<h', int(sample * 32767))
+        path = os.path.join(directory, f"bench_{index}.wav")
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(bytes(frames))
+        paths.append(path)
+    return paths
+
+
+# --- Measurement ---
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(k), math.ceil(k)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def peak_rss_mb():
+    """Process-lifetime high-water mark; only a fallback, since it never drops between configurations."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def current_rss_mb():
+    """Resident set size right now (Linux /proc), or None where it cannot be read."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+class RSSSampler:
+    """Samples RSS on a background thread while one configuration runs, so each gets its own peak."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.start_mb
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+    def __enter__(self):
+        if self.start_mb is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start_mb is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+
+    def stats(self):
+        """{'peak_rss_mb', 'rss_delta_mb'}: peak during the run and its growth over the starting RSS."""
+        if self.start_mb is None:
+            return {'peak_rss_mb': peak_rss_mb(), 'rss_delta_mb': None}
+        return {'peak_rss_mb': round(self.peak_mb, 1), 'rss_delta_mb': round(self.peak_mb - self.start_mb, 1)}
+
+
+def count_tokens(text):
+    if not text:
+        return 0
+    if utils.TRANSLATION_TOKENIZER is not None:
+        return len(utils.TRANSLATION_TOKENIZER.tokenize(text))
+    return len(text.split())
+
+
+def run_load(fn, inputs, concurrency, requests):
+    """Calls fn on inputs round-robin from `concurrency` threads; returns per-request stats."""
+    latencies, tokens, errors = [], [0], [0]
+    lock = threading.Lock()
+
+    def one(i):
+        started = time.perf_counter()
+        try:
+            output = fn(inputs[i % len(inputs)])
+        except Exception:
+            with lock:
+                errors[0] += 1
+            return
+        elapsed = time.perf_counter() - started
+        output_tokens = count_tokens(output)
+        with lock:
+            latencies.append(elapsed)
+            tokens[0] += output_tokens
+
+    started = time.perf_counter()
+    with RSSSampler() as rss, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    return {
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': errors[0],
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(len(latencies) / wall, 3) if wall else None,
+        'tokens_per_second': round(tokens[0] / wall, 1) if wall else None,
+        'p50_ms': round(1000 * percentile(latencies, 50), 1) if latencies else None,
+        'p95_ms': round(1000 * percentile(latencies, 95), 1) if latencies else None,
+        'p99_ms': round(1000 * percentile(latencies, 99), 1) if latencies else None,
+        **rss.stats(),
+    }
+
+
+def _restart_batcher(batch_size):
+    if utils.TRANSLATION_BATCHER is not None:
+        utils.TRANSLATION_BATCHER.stop()
+        utils.TRANSLATION_BATCHER = None
+    utils.TRANSLATION_BATCH_MAX_SIZE = batch_size
+
+
+def bench_translate(args):
+    corpus = build_text_corpus(args.corpus_size)
+    utils.TRANSLATION_CACHE = _NullCache()
+    utils.load_translation_model()
+
+    def translate(text):
+        translated, error = utils.translate_text(text, 'en', args.target)
+        if error:
+            raise Exception(error)
+        return translated
+
+    results = []
+    for batch_size in args.batch_sizes:
+        _restart_batcher(batch_size)
+        translate(corpus[0])  # Warm-up
+        for concurrency in args.concurrency:
+            row = run_load(translate, corpus, concurrency, args.requests)
+            row['batch_size'] = batch_size
+            results.append(row)
+            print(f"translate bs={batch_size:<3} c={concurrency:<3} p50={row['p50_ms']}ms p95={row['p95_ms']}ms "
+                  f"p99={row['p99_ms']}ms tok/s={row['tokens_per_second']} rss={row['peak_rss_mb']}MB (+{row['rss_delta_mb']})")
+    return results
+
+
+def _bench_files(stage, paths, fn, args):
+    fn(paths[0])  # Warm-up
+    results = []
+    for concurrency in args.concurrency:
+        row = run_load(fn, paths, concurrency, max(len(paths), args.file_requests))
+        results.append(row)
+        print(f"{stage:<9} c={concurrency:<3} p50={row['p50_ms']}ms p95={row['p95_ms']}ms "
+              f"p99={row['p99_ms']}ms rss={row['peak_rss_mb']}MB (+{row['rss_delta_mb']})")
+    return results
+
+
+def char_accuracy(predicted, expected):
+    """Character-level similarity (0-1) of whitespace/case-normalised texts."""
+    def normalise(text):
+        return ' '.join((text or '').lower().split())
+    return difflib.SequenceMatcher(None, normalise(predicted), normalise(expected)).ratio()
+
+
+def bench_ocr(args, workdir):
+    paths, texts = build_image_corpus(workdir)
+    expected = dict(zip(paths, texts))
+    results = []
+    for variant in args.ocr_variants:
+        utils.OCR_PREPROCESS = variant == 'preprocessed'
+        print(f"ocr variant: {variant}")
+        rows = _bench_files('ocr', paths, lambda path: utils.perform_ocr(path, 'en')[0], args)
+        accuracy = sum(char_accuracy(utils.perform_ocr(path, 'en')[0], expected[path]) for path in paths) / len(paths)
+        for row in rows:
+            row['variant'] = variant
+            row['char_accuracy'] = round(accuracy, 4)
+        print(f"ocr       {variant}: char accuracy {accuracy:.3f}")
+        results.extend(rows)
+    return results
+
+
+def bench_stt(args, workdir):
+    paths = build_audio_corpus(workdir)
+    return _bench_files('stt', paths, lambda path: utils.perform_stt(path)[0], args)
+
+
+def compare(current, baseline, tolerance):
+    """Lists p95 / throughput regressions beyond tolerance between two result files."""
+    def key(stage, row):
+        return (stage, row.get('batch_size') or row.get('variant'), row['concurrency'])
+
+    base_rows = {key(stage, row): row for stage, rows in baseline['stages'].items() for row in rows}
+    regressions = []
+    for stage, rows in current['stages'].items():
+        for row in rows:
+            base = base_rows.get(key(stage, row))
+            if not base:
+                continue
+            if base['p95_ms'] and row['p95_ms'] and row['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+                regressions.append(f"{stage} {key(stage, row)[1:]}: p95 {base['p95_ms']} -> {row['p95_ms']} ms")
+            if base['throughput_rps'] and row['throughput_rps'] and row['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+                regressions.append(f"{stage} {key(stage, row)[1:]}: throughput {base['throughput_rps']} -> {row['throughput_rps']} rps")
+            if base.get('char_accuracy') and row.get('char_accuracy') is not None and row['char_accuracy'] < base['char_accuracy'] * (1 - tolerance):
+                regressions.append(f"{stage} {key(stage, row)[1:]}: char accuracy {base['char_accuracy']} -> {row['char_accuracy']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark translate_text, perform_ocr and perform_stt.")
+    parser.add_argument('--stages', nargs='+', default=['translate'], choices=['translate', 'ocr', 'stt'])
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 4, 8])
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 8, 16])
+    parser.add_argument('--requests', type=int, default=64, help="Translation requests per run.")
+    parser.add_argument('--file-requests', type=int, default=8, help="OCR/STT requests per run.")
+    parser.add_argument('--corpus-size', type=int, default=64)
+    parser.add_argument('--ocr-variants', nargs='+', default=['preprocessed'], choices=['raw', 'preprocessed'],
+                        help="Run OCR on the raw images and/or through ocr_preprocess.")
+    parser.add_argument('--target', default='Hindi', choices=sorted(utils.SUPPORTED_LANGUAGES))
+    parser.add_argument('--output', help="Write JSON results here.")
+    parser.add_argument('--compare', help="Baseline JSON to check for regressions.")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Allowed relative slowdown (default 10%%).")
+    args = parser.parse_args()
+
+    results = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()},
+        'config': {
+            'translation_backend': utils.TRANSLATION_BACKEND_NAME,
+            'stt_engine': f"{utils.STT_ENGINE_NAME}:{utils.STT_MODEL_SIZE}",
+            'batch_max_wait_ms': utils.TRANSLATION_BATCH_MAX_WAIT_MS,
+            'ocr_preprocess': {
+                'target_text_height': utils.OCR_TARGET_TEXT_HEIGHT,
+                'max_side': utils.OCR_MAX_SIDE,
+                'grayscale': utils.OCR_GRAYSCALE,
+                'binarize': utils.OCR_BINARIZE,
+                'crop': utils.OCR_CROP,
+            },
+            'target': args.target,
+        },
+        'stages': {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix='bench_') as workdir:
+        if 'translate' in args.stages:
+            results['stages']['translate'] = bench_translate(args)
+        if 'ocr' in args.stages:
+            results['stages']['ocr'] = bench_ocr(args, workdir)
+        if 'stt' in args.stages:
+            results['stages']['stt'] = bench_stt(args, workdir)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 # filepath: /Users/shyampatro/Translation project/clear_history.py
 from app import app
-from models import db, TranslationLog
+from models import db, TranslationLog, TextBlob
 
 with app.app_context():
     TranslationLog.query.delete()
+    TextBlob.query.delete()
     db.session.commit()
     print("All translation history deleted.")
\ No newline at end of file
@@ -0,0 +1,95 @@
+# inference_pool.py - Multi-process inference workers sharing model weights copy-on-write
+import gc
+import logging
+import multiprocessing
+import os
+import threading
+
+INFERENCE_TASKS = ('ocr', 'stt', 'translate')
+
+
+def _init_worker(threads_per_worker):
+    """Runs in each forked worker: keep work in-process and give each worker its own intra-op threads."""
+    import utils
+    # The parent's pool handle and locks are meaningless (or held) after fork.
+    utils.INFERENCE_POOL = None
+    utils._TRANSLATION_MODEL_LOCK = threading.Lock()
+    utils._STT_ENGINE_LOCK = threading.Lock()
+    utils._STT_LOADING = {}
+    if utils.TRANSLATION_BACKEND is not None:
+        utils.TRANSLATION_BACKEND.after_fork()
+    try:
+        import torch
+        torch.set_num_threads(max(1, threads_per_worker))
+    except ImportError:
+        pass
+    logging.info(f"Inference worker {os.getpid()} ready.")
+
+
+def _run_ocr(image_path, lang_code):
+    import utils
+    return utils.perform_ocr(image_path, lang_code)
+
+
+def _run_stt(audio_path, lang_code_hint, model_size=None, latency_budget_ms=None):
+    import utils
+    return utils.perform_stt(audio_path, lang_code_hint=lang_code_hint, model_size=model_size, latency_budget_ms=latency_budget_ms)
+
+
+def _run_translate(texts, source_lang_code, target_lang_code):
+    import utils
+    return utils._translate_batch(texts, source_lang_code, target_lang_code)
+
+
+_TASK_FUNCTIONS = {
+    'ocr': _run_ocr,
+    'stt': _run_stt,
+    'translate': _run_translate,
+}
+
+
+def _run_task(task, args):
+    """
+    Runs a task in the worker and returns (result, metric observations): the
+    worker's own registry is never scraped, so its timings travel back to the parent.
+    """
+    import metrics
+    with metrics.collect() as recorded:
+        result = _TASK_FUNCTIONS[task](*args)
+    return result, recorded
+
+
+class InferencePool:
+    """
+    A pool of forked worker processes for OCR, STT and translation.
+    Models must already be loaded in the parent: workers are forked afterwards,
+    so weights are shared copy-on-write and scaling across cores does not
+    multiply RAM. Only the task kinds listed in `tasks` are sent to the pool.
+    """
+
+    def __init__(self, workers, tasks=INFERENCE_TASKS, threads_per_worker=1):
+        unknown = set(tasks) - set(INFERENCE_TASKS)
+        if unknown:
+            raise ValueError(f"Unknown inference task(s): {sorted(unknown)}")
+        self.workers = max(1, int(workers))
+        self.tasks = frozenset(tasks)
+        # Move everything allocated so far out of the GC's reach, so collections in
+        # the children do not touch (and therefore copy) the parent's pages.
+        gc.freeze()
+        ctx = multiprocessing.get_context('fork')
+        self._pool = ctx.Pool(self.workers, initializer=_init_worker, initargs=(threads_per_worker,))
+        logging.info(f"Inference pool started: {self.workers} worker(s) for {sorted(self.tasks)}.")
+
+    def handles(self, task):
+        return task in self.tasks
+
+    def run(self, task, *args):
+        """Runs one task in a worker process and blocks for its result; its metrics are recorded here."""
+        import metrics
+        result, recorded = self._pool.apply(_run_task, (task, args))
+        metrics.replay(recorded)
+        return result
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
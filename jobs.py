@@ -0,0 +1,255 @@
+# jobs.py - Bounded background job queue for OCR/STT uploads
+import functools
+import http.client
+import ipaddress
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import urllib.request
+import uuid
+from urllib.parse import urlparse
+
+# Comma-separated hosts that webhooks may target even if they resolve to private addresses
+JOB_CALLBACK_ALLOWED_HOSTS = {h.strip().lower() for h in os.environ.get('JOB_CALLBACK_ALLOWED_HOSTS', '').split(',') if h.strip()}
+
+
+class JobQueueFull(Exception):
+    """Raised when the queue is at capacity; callers should retry later."""
+
+
+def validate_callback_url(url, allowed_hosts=None):
+    """
+    Rejects webhook URLs that are not http(s) or whose host resolves to a loopback,
+    private, link-local or otherwise non-public address (SSRF), unless the host is
+    in allowed_hosts.
+    Returns:
+        str or None: The validated address to connect to, or None for an allowed host.
+    Raises:
+        ValueError: If the URL may not be used as a callback.
+    """
+    allowed_hosts = JOB_CALLBACK_ALLOWED_HOSTS if allowed_hosts is None else allowed_hosts
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ValueError("callback_url must be an http(s) URL")
+    host = parsed.hostname.lower()
+    if host in allowed_hosts:
+        return None
+    default_port = 443 if parsed.scheme == 'https' else 80
+    try:
+        addresses = sorted({info[4][0] for info in socket.getaddrinfo(host, parsed.port or default_port, proto=socket.IPPROTO_TCP)})
+    except (socket.gaierror, UnicodeError) as e:
+        raise ValueError(f"callback_url host '{host}' could not be resolved") from e
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%', 1)[0])
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"callback_url host '{host}' resolves to a non-public address")
+    return addresses[0]
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Turns every 3xx into an HTTPError: a redirect target has not been validated."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class _PinnedHTTPConnection(http.client.HTTPConnection):
+    """Connects to a pre-validated address; the Host header still names the URL's host."""
+
+    def __init__(self, host, *args, pinned_address=None, **kwargs):
+        super().__init__(host, *args, **kwargs)
+        self.pinned_address = pinned_address
+
+    def connect(self):
+        self.sock = socket.create_connection((self.pinned_address, self.port), self.timeout, self.source_address)
+
+
+class _PinnedHTTPSConnection(http.client.HTTPSConnection):
+    """As _PinnedHTTPConnection; TLS SNI and certificate checks still use the URL's host."""
+
+    def __init__(self, host, *args, pinned_address=None, **kwargs):
+        super().__init__(host, *args, **kwargs)
+        self.pinned_address = pinned_address
+
+    def connect(self):
+        sock = socket.create_connection((self.pinned_address, self.port), self.timeout, self.source_address)
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host)
+
+
+class _PinnedHTTPHandler(urllib.request.HTTPHandler):
+    def __init__(self, address):
+        super().__init__()
+        self.address = address
+
+    def http_open(self, req):
+        return self.do_open(functools.partial(_PinnedHTTPConnection, pinned_address=self.address), req)
+
+
+class _PinnedHTTPSHandler(urllib.request.HTTPSHandler):
+    def __init__(self, address):
+        super().__init__()
+        self.address = address
+
+    def https_open(self, req):
+        return self.do_open(functools.partial(_PinnedHTTPSConnection, pinned_address=self.address), req, context=self._context)
+
+
+def post_callback(url, body, timeout=5):
+    """
+    POSTs a JSON body to a webhook. The URL is validated and the connection goes to
+    the address that was validated (no second DNS lookup to rebind), without proxies,
+    and redirects are refused.
+    Returns:
+        int: The HTTP status.
+    Raises:
+        ValueError: If the URL fails validate_callback_url.
+        urllib.error.URLError: If delivery fails, including any redirect response.
+    """
+    address = validate_callback_url(url)
+    handlers = [urllib.request.ProxyHandler({}), _NoRedirectHandler]
+    if address is not None:
+        handlers += [_PinnedHTTPHandler(address), _PinnedHTTPSHandler(address)]
+    opener = urllib.request.build_opener(*handlers)
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'}, method='POST')
+    with opener.open(req, timeout=timeout) as resp:
+        return resp.status
+
+
+class Job:
+    def __init__(self, kind, payload, params=None, callback_url=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload  # Upload bytes; dropped once the job has run
+        self.params = params or {}
+        self.callback_url = callback_url
+        self.status = 'queued'  # queued -> running -> done | failed
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def to_dict(self, include_result=False):
+        data = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class JobQueue:
+    """
+    Runs jobs on a fixed pool of worker threads.
+    The queue is bounded so uploads are rejected (backpressure) instead of piling
+    up in memory; finished jobs are kept for result_ttl seconds for polling.
+    """
+
+    def __init__(self, handler, workers=2, max_queued=16, result_ttl=3600):
+        """
+        Args:
+            handler (callable): fn(job) -> result dict; exceptions mark the job failed.
+            workers (int): Number of worker threads.
+            max_queued (int): Jobs allowed to wait before submit() raises JobQueueFull.
+            result_ttl (float): Seconds a finished job stays available.
+        """
+        self.handler = handler
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max(1, int(max_queued)))
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._workers = []
+        for i in range(max(1, int(workers))):
+            worker = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, kind, payload, params=None, callback_url=None):
+        self._expire()
+        job = Job(kind, payload, params, callback_url)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise JobQueueFull(f"Job queue is full ({self._queue.maxsize} waiting).")
+        logging.info(f"Queued {kind} job {job.id} (depth={self._queue.qsize()}).")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            'queued': statuses.count('queued'),
+            'running': statuses.count('running'),
+            'done': statuses.count('done'),
+            'failed': statuses.count('failed'),
+            'capacity': self._queue.maxsize,
+            'workers': len(self._workers),
+        }
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished and job.finished_at is not None and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            job.status = 'running'
+            job.started_at = time.time()
+            try:
+                job.result = self.handler(job)
+                # finished_at is set before the status so _expire never sees a finished job without it
+                job.finished_at = time.time()
+                job.status = 'done'
+            except Exception as e:
+                logging.error(f"Job {job.id} failed: {e}")
+                job.error = str(e)
+                job.finished_at = time.time()
+                job.status = 'failed'
+            finally:
+                job.payload = None
+                self._queue.task_done()
+            if job.callback_url:
+                self._notify(job)
+
+    def _notify(self, job):
+        """POSTs the finished job to its webhook; failures are logged, never retried."""
+        body = json.dumps(job.to_dict(include_result=True), ensure_ascii=False).encode('utf-8')
+        try:
+            # Re-validated at delivery time in case the host now resolves elsewhere
+            status = post_callback(job.callback_url, body)
+            logging.info(f"Job {job.id} webhook delivered ({status}).")
+        except ValueError as e:
+            logging.warning(f"Job {job.id} webhook not delivered: {e}")
+        except Exception as e:
+            logging.warning(f"Job {job.id} webhook to {job.callback_url} failed: {e}")
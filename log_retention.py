@@ -0,0 +1,243 @@
+# log_retention.py - Age/row-count retention for translation_log with gzipped JSONL archives
+#
+# Usage:
+#   python log_retention.py                          # apply LOG_RETENTION_DAYS / LOG_MAX_ROWS
+#   python log_retention.py --days 30 --max-rows 50000 --dry-run
+#   python log_retention.py --no-archive --vacuum-pages 0   # delete without archiving, reclaim all free pages
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from process_lock import acquire_process_lock
+
+DEFAULT_DB_PATH = os.path.join('instance', 'translations.db')
+DEFAULT_ARCHIVE_DIR = os.path.join('instance', 'log_archive')
+LOG_RETENTION_DAYS = float(os.environ.get('LOG_RETENTION_DAYS', '90'))
+LOG_MAX_ROWS = int(os.environ.get('LOG_MAX_ROWS', '100000'))
+ARCHIVE_SEGMENT_ROWS = 50000
+DELETE_BATCH_ROWS = 1000
+TABLE = 'translation_log'
+TEXT_TABLE = 'text_blob'
+# Archived rows carry their texts inline, so segments are readable without the database
+_ARCHIVE_QUERY = (
+    f"SELECT l.id, l.timestamp, l.device_id, l.input_type, l.source_language, l.target_language,"
+    f" o.text AS original_text, t.text AS translated_text, l.error_message"
+    f" FROM {TABLE} l"
+    f" LEFT JOIN {TEXT_TABLE} o ON o.hash = l.original_text_hash"
+    f" LEFT JOIN {TEXT_TABLE} t ON t.hash = l.translated_text_hash"
+    f" WHERE l.id > ? AND l.id <= ? ORDER BY l.id LIMIT ?"
+)
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def expired_cutoff_id(conn, days, max_rows):
+    """
+    Highest id to remove: every row older than `days`, plus the oldest rows beyond
+    the newest `max_rows`. Ids grow with time, so "expired" is a single id prefix.
+    Returns:
+        int or None: Rows with id <= this are expired; None if nothing is.
+    """
+    cutoff_ids = []
+    if days:
+        cutoff = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S.%f')
+        row = conn.execute(f"SELECT MAX(id) FROM {TABLE} WHERE timestamp < ?", (cutoff,)).fetchone()
+        if row[0] is not None:
+            cutoff_ids.append(row[0])
+    if max_rows:
+        row = conn.execute(f"SELECT id FROM {TABLE} ORDER BY id DESC LIMIT 1 OFFSET ?", (max_rows,)).fetchone()
+        if row is not None:
+            cutoff_ids.append(row[0])
+    return max(cutoff_ids) if cutoff_ids else None
+
+
+def _write_segment(archive_dir, rows):
+    """Writes rows to a gzipped JSONL segment named by its id range; fsynced before returning."""
+    os.makedirs(archive_dir, exist_ok=True)
+    name = f"{TABLE}-{rows[0]['id']:012d}-{rows[-1]['id']:012d}.jsonl.gz"
+    path = os.path.join(archive_dir, name)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as f:
+            for row in rows:
+                f.write(json.dumps(dict(row), ensure_ascii=False).encode('utf-8') + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def _delete_through(conn, last_id, first_id=None):
+    """
+    Deletes ids in [first_id, last_id] in short transactions so writers are never
+    blocked for long, releasing each row's text_blob references in the same transaction.
+    """
+    deleted = 0
+    while True:
+        with conn:
+            rows = conn.execute(
+                f"SELECT id, original_text_hash, translated_text_hash FROM {TABLE}"
+                f" WHERE id >= ? AND id <= ? ORDER BY id LIMIT ?",
+                (first_id or 0, last_id, DELETE_BATCH_ROWS),
+            ).fetchall()
+            if rows:
+                conn.executemany(f"DELETE FROM {TABLE} WHERE id = ?", [(row['id'],) for row in rows])
+                hashes = [(h,) for row in rows for h in (row['original_text_hash'], row['translated_text_hash']) if h]
+                conn.executemany(f"UPDATE {TEXT_TABLE} SET refcount = refcount - 1 WHERE hash = ?", hashes)
+                conn.executemany(f"DELETE FROM {TEXT_TABLE} WHERE hash = ? AND refcount <= 0", hashes)
+        deleted += len(rows)
+        if len(rows) < DELETE_BATCH_ROWS:
+            return deleted
+
+
+def enable_incremental_vacuum(conn):
+    """
+    Switches the database to auto_vacuum=INCREMENTAL. That takes one full VACUUM,
+    which locks the whole database, so it is done from the CLI or at schema
+    migration - never from retention running inside the app. conn is a DB-API
+    connection with no open transaction.
+    Returns:
+        bool: True if a VACUUM was run.
+    """
+    cursor = conn.cursor()
+    try:
+        if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return False
+        logging.info("Enabling incremental auto-vacuum (one-time full VACUUM)...")
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("VACUUM")
+        return True
+    finally:
+        cursor.close()
+
+
+def incremental_vacuum(conn, pages=None, allow_full_vacuum=False):
+    """
+    Returns free pages to the filesystem.
+    Args:
+        pages (int): Pages to reclaim; None or 0 reclaims all free pages.
+        allow_full_vacuum (bool): If auto_vacuum is not INCREMENTAL yet, switch it
+            on with enable_incremental_vacuum; otherwise nothing is reclaimed.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        if allow_full_vacuum:
+            enable_incremental_vacuum(conn)
+        else:
+            logging.info("Incremental auto-vacuum is not enabled; run log_retention.py once to enable it.")
+        return
+    free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if pages:
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})")
+    else:
+        conn.execute("PRAGMA incremental_vacuum")
+    free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    logging.info(f"Incremental vacuum released {free_before - free_after} page(s).")
+
+
+def run_retention(db_path=DEFAULT_DB_PATH, archive_dir=DEFAULT_ARCHIVE_DIR, days=LOG_RETENTION_DAYS,
+                  max_rows=LOG_MAX_ROWS, archive=True, vacuum_pages=2000, dry_run=False, allow_full_vacuum=False):
+    """
+    Archives (unless archive=False) and deletes expired translation_log rows, then
+    runs an incremental vacuum (see incremental_vacuum for allow_full_vacuum). Each
+    segment is durable on disk before its rows are deleted, so an interrupted run
+    loses nothing.
+    Returns:
+        dict: {'expired', 'archived', 'deleted', 'segments'}
+    """
+    summary = {'expired': 0, 'archived': 0, 'deleted': 0, 'segments': []}
+    conn = _connect(db_path)
+    try:
+        last_id = expired_cutoff_id(conn, days, max_rows)
+        if last_id is None:
+            logging.info("Log retention: nothing expired.")
+            return summary
+        summary['expired'] = conn.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE id <= ?", (last_id,)).fetchone()[0]
+        if dry_run:
+            logging.info(f"Log retention (dry run): {summary['expired']} row(s) up to id {last_id} would be removed.")
+            return summary
+
+        if archive:
+            after_id = 0
+            while True:
+                rows = conn.execute(_ARCHIVE_QUERY, (after_id, last_id, ARCHIVE_SEGMENT_ROWS)).fetchall()
+                if not rows:
+                    break
+                summary['segments'].append(_write_segment(archive_dir, rows))
+                summary['archived'] += len(rows)
+                summary['deleted'] += _delete_through(conn, rows[-1]['id'], rows[0]['id'])
+                after_id = rows[-1]['id']
+        else:
+            summary['deleted'] = _delete_through(conn, last_id)
+
+        if vacuum_pages is not None:
+            incremental_vacuum(conn, vacuum_pages, allow_full_vacuum=allow_full_vacuum)
+        logging.info(f"Log retention: archived {summary['archived']}, deleted {summary['deleted']} row(s) "
+                     f"into {len(summary['segments'])} segment(s).")
+        return summary
+    finally:
+        conn.close()
+
+
+def start_periodic_retention(interval_hours, **kwargs):
+    """
+    Runs run_retention every interval_hours on a daemon thread. Every app process
+    may start one, but only the process holding <db_path>.retention.lock runs
+    retention; if it exits, another process takes over at its next interval.
+    """
+    lock_path = f"{kwargs.get('db_path', DEFAULT_DB_PATH)}.retention.lock"
+
+    def _loop():
+        lock_file = None
+        while True:
+            time.sleep(interval_hours * 3600)
+            if lock_file is None:
+                lock_file = acquire_process_lock(lock_path)
+                if lock_file is None:
+                    continue
+            try:
+                run_retention(**kwargs)
+            except Exception as e:
+                logging.error(f"Log retention failed: {e}")
+
+    thread = threading.Thread(target=_loop, name="log-retention", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive and delete old translation logs, then reclaim space.")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database path.")
+    parser.add_argument('--archive-dir', default=DEFAULT_ARCHIVE_DIR, help="Where gzipped JSONL segments are written.")
+    parser.add_argument('--days', type=float, default=LOG_RETENTION_DAYS, help="Remove rows older than this (0 = no age limit).")
+    parser.add_argument('--max-rows', type=int, default=LOG_MAX_ROWS, help="Keep at most this many newest rows (0 = no limit).")
+    parser.add_argument('--no-archive', action='store_true', help="Delete expired rows without archiving them.")
+    parser.add_argument('--vacuum-pages', type=int, default=2000, help="Pages to reclaim (0 = all, -1 = skip vacuum).")
+    parser.add_argument('--dry-run', action='store_true', help="Only report how many rows would be removed.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    result = run_retention(
+        db_path=args.db,
+        archive_dir=args.archive_dir,
+        days=args.days,
+        max_rows=args.max_rows,
+        archive=not args.no_archive,
+        vacuum_pages=None if args.vacuum_pages < 0 else args.vacuum_pages,
+        dry_run=args.dry_run,
+        allow_full_vacuum=True,
+    )
+    print(json.dumps({key: value for key, value in result.items() if key != 'segments'}))
+    for segment in result['segments']:
+        print(f"Archived: {segment}")
@@ -0,0 +1,200 @@
+# log_writer.py - Background, batched inserts of TranslationLog rows
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event, insert
+
+from metrics import time_stage
+
+
+def enable_sqlite_wal(engine):
+    """
+    Applies write-friendly pragmas to every SQLite connection: WAL lets readers
+    run alongside the single writer and synchronous=NORMAL drops the per-commit
+    fsync (durable at checkpoints; a power loss can lose only the last commits).
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-16000")  # 16 MB page cache
+        cursor.close()
+
+    # Connections opened before the listener was attached keep their old settings
+    engine.dispose()
+
+
+class LogWriter:
+    """
+    Requests submit() log rows to an in-memory queue; one writer thread inserts
+    them with a single executemany + commit whenever flush_size rows are waiting
+    or flush_interval seconds have passed. Pending rows are flushed on stop(),
+    which is registered with atexit.
+    """
+
+    def __init__(self, app, db, model, flush_size=64, flush_interval=0.5, max_queued=10000, intern_texts=None):
+        """
+        Args:
+            app: Flask app, for the app context the writer thread needs.
+            db: The Flask-SQLAlchemy instance.
+            model: Mapped class the rows are inserted into.
+            flush_size (int): Rows per bulk insert.
+            flush_interval (float): Longest a submitted row waits before being written.
+            max_queued (int): Queue bound; submit() writes synchronously when it is full.
+            intern_texts (callable): fn(session, [(hash, text)]) run in the same transaction
+                before each bulk insert, for entries that define pending_texts().
+        """
+        self.app = app
+        self.db = db
+        self.model = model
+        self.intern_texts = intern_texts
+        self.flush_size = max(1, int(flush_size))
+        self.flush_interval = max(0.01, float(flush_interval))
+        self._queue = queue.Queue(maxsize=max(1, int(max_queued)))
+        self._stopping = threading.Event()
+        self._flushed = threading.Condition()
+        self._pending = 0
+        self.stats_counters = {'submitted': 0, 'written': 0, 'batches': 0, 'sync_writes': 0, 'failed': 0}
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _row(self, entry):
+        """
+        (column values, texts to intern) of a transient model instance; the
+        timestamp is fixed at submit time.
+        """
+        if entry.timestamp is None:
+            entry.timestamp = datetime.utcnow()
+        values = {
+            column.key: getattr(entry, column.key)
+            for column in self.model.__table__.columns
+            if column.key != 'id'
+        }
+        texts = entry.pending_texts() if hasattr(entry, 'pending_texts') else []
+        return values, texts
+
+    def submit(self, entry):
+        """Queues a TranslationLog instance (not added to any session) for writing."""
+        row = self._row(entry)
+        with self._flushed:
+            self._pending += 1
+            self.stats_counters['submitted'] += 1
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Backpressure: the caller pays for its own write instead of growing memory
+            with self._flushed:
+                self.stats_counters['sync_writes'] += 1
+            self._write([row])
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def flush(self, timeout=5.0):
+        """Blocks until everything submitted so far has been written (or timeout)."""
+        deadline = time.monotonic() + timeout
+        with self._flushed:
+            while self._pending > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._flushed.wait(remaining)
+        return True
+
+    def stop(self, timeout=10.0):
+        """Stops the writer thread after it has flushed every queued row."""
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        # Anything submitted after the thread exited
+        self._drain_and_write()
+
+    def stats(self):
+        with self._flushed:
+            counters = dict(self.stats_counters)
+        return dict(counters, queued=self._queue.qsize())
+
+    def _drain_and_write(self):
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if rows:
+            self._write(rows)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                rows = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.flush_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    rows.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(rows)
+        self._drain_and_write()
+
+    def _insert(self, rows):
+        """Interns the rows' texts and inserts the rows in one transaction."""
+        with self.app.app_context():
+            try:
+                with time_stage('db_commit'):
+                    texts = [pair for _, row_texts in rows for pair in row_texts]
+                    if texts and self.intern_texts is not None:
+                        self.intern_texts(self.db.session, texts)
+                    self.db.session.execute(insert(self.model), [values for values, _ in rows])
+                    self.db.session.commit()
+            except Exception:
+                self.db.session.rollback()
+                raise
+
+    def _write(self, rows):
+        """
+        Writes rows as one batch; if the batch fails, retries them one by one so a
+        single bad row does not take the rest of the batch with it.
+        """
+        written = failed = batches = 0
+        try:
+            self._insert(rows)
+            written, batches = len(rows), 1
+        except Exception as e:
+            if len(rows) == 1:
+                logging.error(f"Failed to write translation log row: {e}")
+                failed = 1
+            else:
+                logging.warning(f"Batch write of {len(rows)} translation log rows failed ({e}); retrying row by row.")
+                for row in rows:
+                    try:
+                        self._insert([row])
+                        written += 1
+                        batches += 1
+                    except Exception as row_error:
+                        logging.error(f"Failed to write translation log row: {row_error}")
+                        failed += 1
+        finally:
+            with self._flushed:
+                self.stats_counters['written'] += written
+                self.stats_counters['batches'] += batches
+                self.stats_counters['failed'] += failed
+                self._pending -= len(rows)
+                self._flushed.notify_all()
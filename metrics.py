@@ -0,0 +1,248 @@
+# metrics.py - Minimal Prometheus-style metrics (counters, gauges, histograms) with text exposition
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# Set per thread by collect(): observations are recorded there instead of in this
+# process's registry, so forked inference workers can hand them to the parent
+_COLLECTING = threading.local()
+
+
+def _collected(metric, method, value, labels):
+    """Appends an observation to the active collect() list; False if none is active."""
+    recorded = getattr(_COLLECTING, 'recorded', None)
+    if recorded is None:
+        return False
+    recorded.append((metric.name, method, value, labels))
+    return True
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = [(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for name, value in pairs]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._callback = None
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def set_function(self, callback):
+        """
+        Reads values from callback at scrape time instead of storing them.
+        The callback returns a number (no labels) or {label_values_tuple: number}.
+        """
+        self._callback = callback
+
+    def _callback_samples(self):
+        try:
+            values = self._callback()
+        except Exception:
+            return []
+        if isinstance(values, dict):
+            return [(self.name, key if isinstance(key, tuple) else (key,), value) for key, value in values.items()]
+        return [(self.name, (), values)]
+
+    def samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for sample_name, label_values, value, *extra in self.samples():
+            lines.append(f"{sample_name}{_format_labels(self.labelnames, label_values, extra[0] if extra else ())} {_format_value(value)}")
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        if _collected(self, 'inc', amount, labels):
+            return
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        if self._callback is not None:
+            return self._callback_samples()
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        if _collected(self, 'set', value, labels):
+            return
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._values = {}  # key -> [bucket_counts, sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        if _collected(self, 'observe', value, labels):
+            return
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    samples.append((f"{self.name}_bucket", key, bucket_count, (('le', _format_value(bound)),)))
+                samples.append((f"{self.name}_sum", key, total))
+                samples.append((f"{self.name}_count", key, count))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def get(self, name):
+        with self._lock:
+            return next((metric for metric in self._metrics if metric.name == name), None)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# --- Metrics shared by the app and utils ---
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'translator_stage_seconds', 'Time spent in each request stage.', ('stage',)))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'translator_http_request_seconds', 'HTTP request latency by endpoint.', ('endpoint', 'method', 'status')))
+PIPELINE_CACHE = REGISTRY.register(Counter(
+    'translator_pipeline_cache_total', 'Translation pipeline lookups by result.', ('result',)))
+TRANSLATION_CACHE = REGISTRY.register(Counter(
+    'translator_translation_cache_total', 'Translation cache lookups by tier/result.', ('result',)))
+TTS_CACHE = REGISTRY.register(Counter(
+    'translator_tts_cache_total', 'TTS audio cache lookups and evictions.', ('result',)))
+MODEL_LOAD_SECONDS = REGISTRY.register(Gauge(
+    'translator_model_load_seconds', 'Duration of the most recent load of each model.', ('engine',)))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    'translator_queue_depth', 'Items waiting in internal queues.', ('queue',)))
+BATCH_SIZE = REGISTRY.register(Histogram(
+    'translator_inference_batch_size', 'Texts per model generate call.', (), buckets=(1, 2, 4, 8, 16, 32, 64)))
+
+_QUEUE_SOURCES = {}
+
+
+def register_queue(name, depth_fn):
+    """Exposes depth_fn() as translator_queue_depth{queue=name}."""
+    _QUEUE_SOURCES[name] = depth_fn
+
+
+def _queue_depths():
+    depths = {}
+    for name, depth_fn in list(_QUEUE_SOURCES.items()):
+        try:
+            depths[(name,)] = depth_fn()
+        except Exception:
+            continue
+    return depths
+
+
+QUEUE_DEPTH.set_function(_queue_depths)
+
+
+@contextmanager
+def time_stage(stage):
+    """Records the duration of the enclosed block under translator_stage_seconds{stage=...}."""
+    with STAGE_SECONDS.time(stage=stage):
+        yield
+
+
+@contextmanager
+def collect():
+    """
+    Records every metric update made on this thread in the enclosed block into the
+    yielded list instead of the registry; pass the list to replay() in the process
+    that serves /metrics.
+    """
+    recorded = []
+    previous = getattr(_COLLECTING, 'recorded', None)
+    _COLLECTING.recorded = recorded
+    try:
+        yield recorded
+    finally:
+        _COLLECTING.recorded = previous
+
+
+def replay(recorded):
+    """Applies observations captured by collect() (e.g. in an inference worker) to this registry."""
+    for name, method, value, labels in recorded or ():
+        metric = REGISTRY.get(name)
+        if metric is not None:
+            getattr(metric, method)(value, **labels)
+
+
+def render():
+    return REGISTRY.render()
@@ -1,18 +1,143 @@
 # models.py
+import hashlib
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 
 db = SQLAlchemy()
 
+
+def text_hash(text):
+    """Content address of a text: sha256 hex of its UTF-8 bytes."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class TextBlob(db.Model):
+    """
+    Each distinct log text stored once, keyed by its hash. refcount is the number
+    of TranslationLog columns pointing at it; rows at zero are deleted.
+    """
+    __tablename__ = 'text_blob'
+    hash = db.Column(db.String(64), primary_key=True)
+    text = db.Column(db.Text, nullable=False)
+    refcount = db.Column(db.Integer, nullable=False, default=0)
+
+
 class TranslationLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    device_id = db.Column(db.String(64), nullable=True) # Client-generated id; indexed via ix_translation_log_device_timestamp
     input_type = db.Column(db.String(20), nullable=False) # 'text', 'ocr', 'audio'
     source_language = db.Column(db.String(10), nullable=False) # e.g., 'en', 'hi'
     target_language = db.Column(db.String(10), nullable=False) # e.g., 'mr', 'ta', 'bn'
-    original_text = db.Column(db.Text, nullable=True)
-    translated_text = db.Column(db.Text, nullable=True)
+    original_text_hash = db.Column(db.String(64), db.ForeignKey('text_blob.hash'), nullable=True)
+    translated_text_hash = db.Column(db.String(64), db.ForeignKey('text_blob.hash'), nullable=True)
     error_message = db.Column(db.Text, nullable=True) # Store errors if any
 
+    # Texts are loaded with the row through two primary-key joins
+    original_blob = db.relationship(TextBlob, foreign_keys=[original_text_hash], lazy='joined')
+    translated_blob = db.relationship(TextBlob, foreign_keys=[translated_text_hash], lazy='joined')
+
+    __table_args__ = (
+        # Serves "latest N for a device" and keyset pages (timestamp, id) < cursor as one index range scan
+        db.Index('ix_translation_log_device_timestamp', 'device_id', 'timestamp', 'id'),
+    )
+
+    def _get_text(self, field):
+        pending = self.__dict__.get(f'_pending_{field}')
+        if pending is not None:
+            return pending
+        blob = getattr(self, f'{field}_blob')
+        return blob.text if blob is not None else None
+
+    def _set_text(self, field, text):
+        # Keep the text until LOG_WRITER interns it (see pending_texts); the hash is the stored value
+        text = text or None
+        self.__dict__[f'_pending_{field}'] = text
+        setattr(self, f'{field}_text_hash', text_hash(text) if text else None)
+
+    @property
+    def original_text(self):
+        return self._get_text('original')
+
+    @original_text.setter
+    def original_text(self, text):
+        self._set_text('original', text)
+
+    @property
+    def translated_text(self):
+        return self._get_text('translated')
+
+    @translated_text.setter
+    def translated_text(self, text):
+        self._set_text('translated', text)
+
+    def pending_texts(self):
+        """(hash, text) pairs that must exist in text_blob before this row is inserted."""
+        return [
+            (getattr(self, f'{field}_text_hash'), self.__dict__[f'_pending_{field}'])
+            for field in ('original', 'translated')
+            if self.__dict__.get(f'_pending_{field}')
+        ]
+
     def __repr__(self):
-        return f'<TranslationLog {self.id}: {self.source_language} -> {self.target_language}>'
\ No newline at end of file
+        return f'<TranslationLog {self.id}: {self.source_language} -> {self.target_language}>'
+
+
+def intern_texts(session, pairs):
+    """Inserts each (hash, text) or bumps its refcount; one executemany for the whole batch."""
+    if pairs:
+        session.execute(
+            db.text(
+                "INSERT INTO text_blob (hash, text, refcount) VALUES (:hash, :text, 1)"
+                " ON CONFLICT(hash) DO UPDATE SET refcount = refcount + 1"
+            ),
+            [{'hash': h, 'text': text} for h, text in pairs],
+        )
+
+
+def migrate_schema():
+    """
+    Brings an existing database up to the current models: create_all() only creates
+    missing tables, so columns and indexes added later are applied here. Also switches
+    on incremental auto-vacuum for log retention. Idempotent.
+    """
+    table = TranslationLog.__table__
+    with db.engine.begin() as conn:
+        columns = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table.name})")}
+        for column in ('device_id', 'original_text_hash', 'translated_text_hash'):
+            if column not in columns:
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column} VARCHAR(64)")
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+        # Move texts stored inline by older versions into text_blob
+        legacy = [column for column in ('original_text', 'translated_text') if column in columns]
+        for column in legacy:
+            rows = conn.exec_driver_sql(
+                f"SELECT id, {column} FROM {table.name} WHERE {column} IS NOT NULL AND {column} != ''"
+            ).fetchall()
+            if rows:
+                pairs = [(text_hash(text), text) for _, text in rows]
+                conn.exec_driver_sql(
+                    "INSERT INTO text_blob (hash, text, refcount) VALUES (?, ?, 1)"
+                    " ON CONFLICT(hash) DO UPDATE SET refcount = refcount + 1",
+                    pairs,
+                )
+                conn.exec_driver_sql(
+                    f"UPDATE {table.name} SET {column}_hash = ?, {column} = NULL WHERE id = ?",
+                    [(h, row_id) for (h, _), (row_id, _) in zip(pairs, rows)],
+                )
+        for column in legacy:
+            try:
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} DROP COLUMN {column}")
+            except Exception:
+                pass # SQLite < 3.35 cannot drop columns; the emptied column stays
+
+    # Retention inside the app never runs the one-time full VACUUM this needs; do it
+    # here, at startup, before the log writer holds the database
+    from log_retention import enable_incremental_vacuum
+    raw = db.engine.raw_connection()
+    try:
+        enable_incremental_vacuum(raw)
+    finally:
+        raw.close()
@@ -0,0 +1,136 @@
+# ocr_preprocess.py - Shrinks and cleans photos before EasyOCR so detection runs on fewer pixels
+import logging
+
+import numpy as np
+
+# Line height (px) to aim for: EasyOCR's detector reads text well at 20-40 px
+DEFAULT_TARGET_TEXT_HEIGHT = 32
+# Never hand the detector more than this many pixels on the long side
+DEFAULT_MAX_SIDE = 2000
+# Runs of inked rows shorter than this are noise, not text lines
+_MIN_LINE_HEIGHT = 4
+
+
+def load_image(image):
+    """
+    Returns an upright RGB uint8 array. Paths are decoded with upload_io.decode_image,
+    which applies the EXIF orientation, so rotated phone photos read the same from
+    disk as from an in-memory upload; arrays are returned as they are.
+    """
+    if isinstance(image, np.ndarray):
+        return image
+    from upload_io import decode_image
+    try:
+        with open(image, 'rb') as f:
+            return decode_image(f.read())
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Could not read image: {image}") from e
+
+
+def _binarize(gray):
+    """Otsu threshold; returns a mask with ink (dark text) as True."""
+    import cv2
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    ink = binary == 0
+    # Light text on a dark background: ink is whichever side is the minority
+    return ink if ink.mean() <= 0.5 else ~ink
+
+
+def estimate_text_height(ink):
+    """
+    Median height of text lines, from runs of rows whose ink coverage is above
+    the page's background level (a horizontal projection profile).
+    Returns:
+        float or None: Line height in pixels, None if no lines were found.
+    """
+    row_ink = ink.mean(axis=1)
+    threshold = max(0.01, float(np.percentile(row_ink, 50)) * 0.5)
+    inked = row_ink > threshold
+    heights = []
+    run = 0
+    for is_inked in inked:
+        if is_inked:
+            run += 1
+        elif run:
+            heights.append(run)
+            run = 0
+    if run:
+        heights.append(run)
+    heights = [h for h in heights if h >= _MIN_LINE_HEIGHT]
+    return float(np.median(heights)) if heights else None
+
+
+def text_bounding_box(ink, pad=16):
+    """
+    Union box around dilated ink blobs, padded; isolated specks are ignored.
+    Returns:
+        tuple or None: (x0, y0, x1, y1), None if nothing text-like was found.
+    """
+    import cv2
+    mask = ink.astype(np.uint8) * 255
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 5))
+    dilated = cv2.dilate(mask, kernel, iterations=2)
+    contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_area = ink.shape[0] * ink.shape[1] * 0.0005
+    boxes = [cv2.boundingRect(c) for c in contours if cv2.contourArea(c) >= min_area]
+    if not boxes:
+        return None
+    x0 = min(x for x, _, _, _ in boxes)
+    y0 = min(y for _, y, _, _ in boxes)
+    x1 = max(x + w for x, _, w, _ in boxes)
+    y1 = max(y + h for _, y, _, h in boxes)
+    height, width = ink.shape
+    return max(0, x0 - pad), max(0, y0 - pad), min(width, x1 + pad), min(height, y1 + pad)
+
+
+def preprocess_image(image, target_text_height=DEFAULT_TARGET_TEXT_HEIGHT, max_side=DEFAULT_MAX_SIDE,
+                     grayscale=True, binarize=False, crop=False):
+    """
+    EXIF-rotate, downscale so text lines are about target_text_height px (and
+    the long side at most max_side), then optionally convert to grayscale,
+    binarize and crop to the detected text region. Images are never upscaled.
+    Args:
+        image: File path or RGB array.
+    Returns:
+        tuple: (array for reader.readtext, info dict with scale/text_height/crop)
+    """
+    import cv2
+
+    rgb = load_image(image)
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY) if rgb.ndim == 3 else rgb
+    info = {'original_size': (gray.shape[1], gray.shape[0]), 'scale': 1.0, 'text_height': None, 'crop': None}
+
+    ink = None
+    if crop or target_text_height:
+        # Measure on a bounded copy so huge photos stay cheap to analyse
+        probe_scale = min(1.0, 1000.0 / max(gray.shape))
+        probe = cv2.resize(gray, None, fx=probe_scale, fy=probe_scale, interpolation=cv2.INTER_AREA) if probe_scale < 1.0 else gray
+        ink = _binarize(probe)
+
+    if crop:
+        box = text_bounding_box(ink)
+        if box is not None:
+            x0, y0, x1, y1 = (int(round(v / probe_scale)) for v in box)
+            rgb, gray = rgb[y0:y1, x0:x1], gray[y0:y1, x0:x1]
+            ink = ink[box[1]:box[3], box[0]:box[2]]
+            info['crop'] = (x0, y0, x1, y1)
+
+    scale = 1.0
+    if target_text_height:
+        text_height = estimate_text_height(ink)
+        if text_height:
+            info['text_height'] = round(text_height / probe_scale, 1)
+            scale = min(scale, target_text_height / info['text_height'])
+    if max_side:
+        scale = min(scale, max_side / max(gray.shape))
+
+    source = gray if (grayscale or binarize) else rgb
+    if scale < 1.0:
+        source = cv2.resize(source, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        info['scale'] = round(scale, 3)
+
+    if binarize:
+        source = cv2.adaptiveThreshold(source, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15)
+
+    logging.debug(f"OCR preprocess: {info['original_size']} -> {source.shape[1]}x{source.shape[0]} ({info})")
+    return source, info
@@ -0,0 +1,122 @@
+# ocr_readers.py - LRU registry of EasyOCR readers keyed by script set
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+# EasyOCR can only combine languages that share a script (plus English).
+DEFAULT_OCR_SCRIPT_SET = ('en', 'hi')
+OCR_SCRIPT_SETS = {
+    'en': DEFAULT_OCR_SCRIPT_SET,
+    'hi': DEFAULT_OCR_SCRIPT_SET,
+    'mr': ('en', 'hi', 'mr', 'ne'),
+    'ne': ('en', 'hi', 'mr', 'ne'),
+    'bn': ('en', 'bn', 'as'),
+    'as': ('en', 'bn', 'as'),
+    'ta': ('en', 'ta'),
+    'te': ('en', 'te'),
+    'kn': ('en', 'kn'),
+    'ur': ('en', 'ur'),
+}
+# Estimated footprint when RSS cannot be measured (detector + one recognizer).
+DEFAULT_READER_SIZE_MB = 250
+
+
+def script_set_for(lang_code):
+    """Maps a short language code to the EasyOCR script set that can read it."""
+    script_set = OCR_SCRIPT_SETS.get(lang_code)
+    if script_set is None:
+        logging.warning(f"EasyOCR has no recognizer for '{lang_code}', using default scripts {DEFAULT_OCR_SCRIPT_SET}.")
+        return DEFAULT_OCR_SCRIPT_SET
+    return script_set
+
+
+def _current_rss_mb():
+    """Resident set size of this process in MB, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class OCRReaderRegistry:
+    """
+    Loads EasyOCR readers lazily, one per script set, and keeps them in LRU order.
+    Least recently used readers are evicted once the estimated total size exceeds
+    budget_mb or more than max_readers are loaded; the pinned set is never evicted.
+    """
+
+    def __init__(self, reader_factory, budget_mb=1500, max_readers=4, pinned=DEFAULT_OCR_SCRIPT_SET):
+        """
+        Args:
+            reader_factory (callable): fn(list_of_langs) -> reader.
+        """
+        self.reader_factory = reader_factory
+        self.budget_mb = budget_mb
+        self.max_readers = max(1, int(max_readers))
+        self.pinned = tuple(pinned)
+        self._readers = OrderedDict()  # script_set -> (reader, size_mb)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def get(self, lang_code):
+        return self.get_for_scripts(script_set_for(lang_code))
+
+    def get_for_scripts(self, script_set):
+        script_set = tuple(script_set)
+        with self._lock:
+            entry = self._readers.get(script_set)
+            if entry is not None:
+                self._readers.move_to_end(script_set)
+                return entry[0]
+            load_lock = self._load_locks.setdefault(script_set, threading.Lock())
+
+        # Per-set lock: concurrent requests for the same scripts load it once.
+        with load_lock:
+            with self._lock:
+                entry = self._readers.get(script_set)
+                if entry is not None:
+                    return entry[0]
+
+            logging.info(f"Loading EasyOCR reader for scripts {list(script_set)}...")
+            rss_before = _current_rss_mb()
+            reader = self.reader_factory(list(script_set))
+            rss_after = _current_rss_mb()
+            size_mb = DEFAULT_READER_SIZE_MB
+            # A near-zero delta means the measurement was useless (e.g. pages freed meanwhile).
+            if rss_before is not None and rss_after is not None and rss_after - rss_before >= 1:
+                size_mb = rss_after - rss_before
+            logging.info(f"EasyOCR reader for {list(script_set)} loaded (~{size_mb:.0f} MB).")
+
+            with self._lock:
+                self._readers[script_set] = (reader, size_mb)
+                self._evict()
+            return reader
+
+    def put(self, script_set, reader, size_mb=DEFAULT_READER_SIZE_MB):
+        """Registers an already constructed reader (e.g. the startup default)."""
+        with self._lock:
+            self._readers[tuple(script_set)] = (reader, size_mb)
+            self._evict()
+
+    def _evict(self):
+        def over_budget():
+            total = sum(size for _, size in self._readers.values())
+            return len(self._readers) > self.max_readers or (self.budget_mb and total > self.budget_mb)
+
+        for script_set in list(self._readers):
+            if not over_budget() or len(self._readers) <= 1:
+                break
+            if script_set == self.pinned:
+                continue
+            # Only the newest reader left besides the pinned one: keep it.
+            if script_set == next(reversed(self._readers)):
+                break
+            del self._readers[script_set]
+            logging.info(f"Evicted EasyOCR reader for scripts {list(script_set)}.")
+
+    def loaded(self):
+        with self._lock:
+            return {','.join(script_set): round(size, 1) for script_set, (_, size) in self._readers.items()}
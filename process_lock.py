@@ -0,0 +1,23 @@
+# process_lock.py - Advisory file locks so only one of several app worker processes runs a task
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every process runs the task itself
+    fcntl = None
+
+
+def acquire_process_lock(lock_path, blocking=False):
+    """
+    Exclusive lock on lock_path, held until the returned file is closed (or the
+    process exits). With blocking=True waits for the current holder to release it.
+    Returns:
+        file or None: The open lock file (keep it open), or None if another process holds it.
+    """
+    lock_file = open(lock_path, 'a')
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
@@ -0,0 +1,253 @@
+# scheme_audio.py - Pre-generated speech for GOVERNMENT_SCHEMES in every TTS-capable language
+#
+# Usage (offline, after scheme_translations.py):
+#   python scheme_audio.py                 # synthesize clips that are new or whose text changed
+#   python scheme_audio.py --force         # resynthesize everything
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+
+from process_lock import acquire_process_lock
+from schemes_data import GOVERNMENT_SCHEMES
+from scheme_translations import TRANSLATABLE_FIELDS, DEFAULT_STORE_PATH as DEFAULT_TRANSLATIONS_PATH
+from tts_cache import MIMETYPES, make_tts_key
+import tts_engines
+
+DEFAULT_AUDIO_DIR = os.path.join('instance', 'scheme_audio')
+_CLIP_NAME = re.compile(r'^[0-9a-f]{64}\.(' + '|'.join(MIMETYPES) + r')$')
+
+
+class SchemeAudioStore:
+    """
+    Content-addressed clips under <directory>/<digest[:2]>/<digest>.<ext> (digest = sha256
+    of the audio, so identical clips are stored once) plus manifest.json:
+        {scheme_id: {nllb_code: {field: {"text_key": str, "clip": "<digest>.<ext>"}}}}
+    text_key is tts_cache.make_tts_key of the spoken text and the voice that spoke it, so a
+    clip is resynthesized only when its text (or best available voice) changes and /tts can
+    serve scheme text straight from the store.
+    """
+
+    def __init__(self, directory=DEFAULT_AUDIO_DIR):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, 'manifest.json')
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._manifest = {}
+        self._by_text_key = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read scheme audio manifest {self.manifest_path}: {e}")
+            return
+        with self._lock:
+            self._manifest = manifest if isinstance(manifest, dict) else {}
+            self._reindex()
+
+    def _reindex(self):
+        self._by_text_key = {
+            entry['text_key']: entry['clip']
+            for languages in self._manifest.values()
+            for fields in languages.values()
+            for entry in fields.values()
+        }
+
+    def save(self):
+        with self._lock:
+            snapshot = json.dumps(self._manifest, indent=1)
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='manifest.', suffix='.json.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.manifest_path)
+
+    def clip_path(self, clip):
+        """Filesystem path of a clip name, or None if the name is invalid or the file is missing."""
+        if not _CLIP_NAME.match(clip or ''):
+            return None
+        path = os.path.join(self.directory, clip[:2], clip)
+        return path if os.path.exists(path) else None
+
+    def clip_mimetype(self, clip):
+        return MIMETYPES[clip.rsplit('.', 1)[-1]]
+
+    def get_clips(self, scheme_id, language=None):
+        """Returns {nllb_code: {field: clip}} for a scheme, or one language's {field: clip}."""
+        with self._lock:
+            languages = self._manifest.get(scheme_id, {})
+            clips = {lang: {field: entry['clip'] for field, entry in fields.items()} for lang, fields in languages.items()}
+        if language:
+            return clips.get(language, {})
+        return clips
+
+    def find(self, text_key):
+        """Clip already synthesized for this exact text and /tts lang code, or None."""
+        with self._lock:
+            return self._by_text_key.get(text_key)
+
+    def _write_clip(self, audio, extension):
+        digest = hashlib.sha256(audio).hexdigest()
+        clip = f"{digest}.{extension}"
+        directory = os.path.join(self.directory, digest[:2])
+        path = os.path.join(directory, clip)
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        return clip
+
+    @staticmethod
+    def _scheme_texts(scheme, nllb_code, translations):
+        """{field: text} to speak for one scheme in one language; English uses the source text."""
+        if nllb_code == 'eng_Latn':
+            return {field: scheme[field] for field in TRANSLATABLE_FIELDS if scheme.get(field)}
+        import utils
+        friendly_names = {code: name for name, code in utils.SUPPORTED_LANGUAGES.items()}
+        friendly_name = friendly_names.get(nllb_code)
+        if not friendly_name or translations is None:
+            return {}
+        return translations.get_translations(scheme['id'], friendly_name)
+
+    def build(self, schemes=None, translations=None, languages=None, force=False):
+        """
+        Synthesizes every scheme field in every TTS-capable language whose text is new
+        or changed, then deletes clips no longer referenced by the manifest.
+        Args:
+            translations (SchemeTranslationStore): Source of the non-English texts.
+            languages (list): NLLB codes (default: every code in MASTER_TTS_CONFIG that an engine can speak).
+        Returns:
+            int: Number of clips synthesized.
+        """
+        schemes = GOVERNMENT_SCHEMES if schemes is None else schemes
+        if languages is None:
+            languages = [code for code in tts_engines.MASTER_TTS_CONFIG if tts_engines.tts_code_for(code)]
+
+        synthesized = reused = 0
+        fresh_keys = set()
+        with self._build_lock:
+            for scheme in schemes:
+                for nllb_code in languages:
+                    tts_lang = tts_engines.tts_code_for(nllb_code)
+                    if not tts_lang:
+                        continue
+                    texts = self._scheme_texts(scheme, nllb_code, translations)
+                    voices = tts_engines.USABLE_VOICES_BY_LANG[tts_lang]
+                    for field, text in texts.items():
+                        with self._lock:
+                            current = self._manifest.get(scheme['id'], {}).get(nllb_code, {}).get(field)
+                        # Voices in preference order: a clip from a fallback engine is replaced
+                        # as soon as the preferred engine can synthesize the text
+                        for engine_name, voice in voices:
+                            text_key = make_tts_key(text, tts_lang, engine_name, voice)
+                            if current and current['text_key'] == text_key and not force and self.clip_path(current['clip']):
+                                break
+                            # The same text in the same voice may already be spoken for another scheme or field
+                            # (with force, only clips synthesized during this build are reused)
+                            existing = self.find(text_key) if not force or text_key in fresh_keys else None
+                            if existing and self.clip_path(existing):
+                                with self._lock:
+                                    self._manifest.setdefault(scheme['id'], {}).setdefault(nllb_code, {})[field] = {
+                                        'text_key': text_key,
+                                        'clip': existing,
+                                    }
+                                reused += 1
+                                break
+                            try:
+                                audio, extension, _, _ = tts_engines.synthesize(text, [(engine_name, voice)])
+                            except Exception as e:
+                                logging.warning(f"Scheme audio failed for {scheme['id']}/{nllb_code}/{field} with {engine_name}: {e}")
+                                continue
+                            clip = self._write_clip(audio, extension)
+                            with self._lock:
+                                self._manifest.setdefault(scheme['id'], {}).setdefault(nllb_code, {})[field] = {
+                                    'text_key': text_key,
+                                    'clip': clip,
+                                }
+                                self._by_text_key[text_key] = clip
+                            fresh_keys.add(text_key)
+                            synthesized += 1
+                            break
+                if synthesized or reused:
+                    self.save()
+
+            known_ids = {scheme['id'] for scheme in GOVERNMENT_SCHEMES}
+            with self._lock:
+                for scheme_id in [scheme_id for scheme_id in self._manifest if scheme_id not in known_ids]:
+                    del self._manifest[scheme_id]
+                self._reindex()
+            self.save()
+            removed = self._remove_orphans()
+
+        logging.info(f"Scheme audio up to date ({synthesized} synthesized, {reused} reused, {removed} orphaned clip(s) removed).")
+        return synthesized
+
+    def _remove_orphans(self):
+        # Every clip the manifest points at: one text_key can map to several clips
+        # (e.g. after force=True), so _by_text_key alone is not enough
+        with self._lock:
+            referenced = {
+                entry['clip']
+                for languages in self._manifest.values()
+                for fields in languages.values()
+                for entry in fields.values()
+            }
+        removed = 0
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if _CLIP_NAME.match(filename) and filename not in referenced:
+                    os.remove(os.path.join(root, filename))
+                    removed += 1
+        return removed
+
+    def start_background_build(self, after=None, **kwargs):
+        """
+        Runs build() on a daemon thread, optionally after another thread (e.g. the
+        translation build) finishes. Like the translation build, worker processes
+        take turns on build.lock and reload the manifest the previous one wrote.
+        """
+        def _run():
+            try:
+                if after is not None:
+                    after.join()
+                os.makedirs(self.directory, exist_ok=True)
+                lock_file = acquire_process_lock(os.path.join(self.directory, 'build.lock'), blocking=True)
+                try:
+                    self.load()
+                    self.build(**kwargs)
+                finally:
+                    lock_file.close()
+            except Exception as e:
+                logging.error(f"Background scheme audio build failed: {e}")
+                import traceback
+                traceback.print_exc()
+
+        thread = threading.Thread(target=_run, name="scheme-audio", daemon=True)
+        thread.start()
+        return thread
+
+
+if __name__ == "__main__":
+    import argparse
+    from scheme_translations import SchemeTranslationStore
+
+    parser = argparse.ArgumentParser(description="Pre-generate scheme audio for every TTS-capable language.")
+    parser.add_argument('--force', action='store_true', help="Resynthesize every clip, even if its text is unchanged.")
+    parser.add_argument('--languages', nargs='*', help="NLLB codes (default: all TTS-capable languages).")
+    parser.add_argument('--translations', default=DEFAULT_TRANSLATIONS_PATH, help="Path of the scheme translation store.")
+    parser.add_argument('--dir', default=DEFAULT_AUDIO_DIR, help="Directory of the audio store.")
+    args = parser.parse_args()
+
+    store = SchemeAudioStore(args.dir)
+    count = store.build(translations=SchemeTranslationStore(args.translations), languages=args.languages, force=args.force)
+    print(f"Synthesized {count} clip(s) into {args.dir}.")
@@ -0,0 +1,173 @@
+# scheme_repository.py - Indexed, read-only view of GOVERNMENT_SCHEMES for lookup, filtering and search
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+from scheme_translations import TRANSLATABLE_FIELDS
+
+SEARCH_FIELDS = ('name', 'fullName', 'summary', 'description', 'benefits', 'eligibility', 'category')
+# Letters/digits plus the combining marks of Indic and Arabic scripts, which \w alone splits on
+_TOKEN = re.compile(r"[\w\u0300-\u036f\u0600-\u06ff\u0900-\u0dff]+")
+# Regions naming the whole country match every region filter
+NATIONWIDE_PREFIX = 'all india'
+
+
+def tokenize(text):
+    return [token.lower() for token in _TOKEN.findall(text or '')]
+
+
+def _split_regions(regions):
+    """Region entries may list several states in one comma-separated string."""
+    return [part.strip() for entry in regions or [] for part in entry.split(',') if part.strip()]
+
+
+class _InvertedIndex:
+    """token -> {position: term frequency}, with a sorted vocabulary for prefix lookups."""
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.vocabulary = []
+
+    def add(self, position, text):
+        for token in tokenize(text):
+            postings = self.postings[token]
+            postings[position] = postings.get(position, 0) + 1
+
+    def freeze(self):
+        self.vocabulary = sorted(self.postings)
+
+    def lookup(self, token, prefix=False):
+        """{position: frequency} for a token, or for every token starting with it."""
+        if not prefix:
+            return self.postings.get(token, {})
+        matches = {}
+        start = bisect.bisect_left(self.vocabulary, token)
+        for word in self.vocabulary[start:]:
+            if not word.startswith(token):
+                break
+            for position, count in self.postings[word].items():
+                matches[position] = matches.get(position, 0) + count
+        return matches
+
+
+class SchemeRepository:
+    """
+    Builds id, category, region and inverted-token indexes over the schemes once.
+    Translated text from a SchemeTranslationStore is indexed per language and
+    re-indexed whenever the store's version changes.
+    """
+
+    def __init__(self, schemes, translations=None):
+        self._schemes = list(schemes)
+        self._translations = translations
+        self._lock = threading.Lock()
+        self._by_id = {scheme['id']: scheme for scheme in self._schemes}
+
+        self._by_category = defaultdict(list)
+        self._by_region = defaultdict(list)
+        self._nationwide = []
+        self._text_index = _InvertedIndex()
+        for position, scheme in enumerate(self._schemes):
+            self._by_category[scheme.get('category', '').lower()].append(position)
+            regions = _split_regions(scheme.get('regions'))
+            if any(region.lower().startswith(NATIONWIDE_PREFIX) for region in regions):
+                self._nationwide.append(position)
+            for region in regions:
+                self._by_region[region.lower()].append(position)
+            for field in SEARCH_FIELDS:
+                self._text_index.add(position, scheme.get(field))
+            self._text_index.add(position, ' '.join(regions))
+        self._text_index.freeze()
+
+        self.categories = sorted({scheme['category'] for scheme in self._schemes if scheme.get('category')})
+        self.regions = sorted({region for scheme in self._schemes for region in _split_regions(scheme.get('regions'))})
+
+        self._translation_indexes = {}  # language -> _InvertedIndex
+        self._translations_version = None
+
+    # --- Lookup ---
+
+    def get(self, scheme_id):
+        return self._by_id.get(scheme_id)
+
+    def all(self, limit=None):
+        return self._schemes[:limit] if limit else self._schemes
+
+    def __len__(self):
+        return len(self._schemes)
+
+    # --- Translated text ---
+
+    def _translation_index_snapshot(self):
+        store = self._translations
+        if store is None:
+            return {}
+        with self._lock:
+            if self._translations_version != store.version:
+                indexes = {}
+                for position, scheme in enumerate(self._schemes):
+                    for language, fields in store.get_translations(scheme['id']).items():
+                        index = indexes.setdefault(language, _InvertedIndex())
+                        for field in TRANSLATABLE_FIELDS:
+                            index.add(position, fields.get(field))
+                for index in indexes.values():
+                    index.freeze()
+                self._translation_indexes = indexes
+                self._translations_version = store.version
+            return self._translation_indexes
+
+    # --- Query ---
+
+    def query(self, q=None, category=None, region=None, language=None, limit=None, offset=0):
+        """
+        Filters by category and region (nationwide schemes match any region) and,
+        if q is given, keeps schemes containing every query token - the last one as
+        a prefix - in English or translated text, ranked by term frequency.
+        Args:
+            language (str): Friendly language name whose translations are searched
+                (default: every translated language).
+        Returns:
+            tuple: (list of schemes for the page, total number of matches)
+        """
+        candidates = None
+        if category:
+            candidates = set(self._by_category.get(category.lower(), ()))
+        if region:
+            in_region = set(self._by_region.get(region.lower(), ())) | set(self._nationwide)
+            candidates = in_region if candidates is None else candidates & in_region
+
+        scores = None
+        tokens = tokenize(q)
+        if tokens:
+            translation_indexes = self._translation_index_snapshot()
+            indexes = [self._text_index]
+            if language:
+                if language in translation_indexes:
+                    indexes.append(translation_indexes[language])
+            else:
+                indexes.extend(translation_indexes.values())
+
+            for i, token in enumerate(tokens):
+                prefix = i == len(tokens) - 1
+                hits = {}
+                for index in indexes:
+                    for position, count in index.lookup(token, prefix=prefix).items():
+                        hits[position] = hits.get(position, 0) + count
+                if scores is None:
+                    scores = hits
+                else:
+                    scores = {position: scores[position] + count for position, count in hits.items() if position in scores}
+                if not scores:
+                    break
+            if candidates is not None:
+                scores = {position: score for position, score in scores.items() if position in candidates}
+            positions = sorted(scores, key=lambda position: (-scores[position], position))
+        elif candidates is not None:
+            positions = sorted(candidates)
+        else:
+            positions = range(len(self._schemes))
+
+        total = len(positions)
+        page = list(positions)[offset:offset + limit] if limit else list(positions)[offset:]
+        return [self._schemes[position] for position in page], total
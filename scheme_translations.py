@@ -0,0 +1,169 @@
+# scheme_translations.py - Precomputed translations of GOVERNMENT_SCHEMES
+#
+# Usage (offline):
+#   python scheme_translations.py            # translate schemes that are new or changed
+#   python scheme_translations.py --force    # retranslate everything
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from process_lock import acquire_process_lock
+from schemes_data import GOVERNMENT_SCHEMES
+
+TRANSLATABLE_FIELDS = ('fullName', 'summary', 'description', 'benefits', 'eligibility')
+DEFAULT_STORE_PATH = os.path.join('instance', 'scheme_translations.json')
+
+
+class SchemeTranslationStore:
+    """
+    JSON-file store of scheme translations:
+        {scheme_id: {"lastUpdated": str, "translations": {language: {field: text}}}}
+    A scheme is rebuilt only when its lastUpdated changes or a language/field is missing.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._data = {}
+        self.version = 0  # Bumped on every change so readers can rebuild derived indexes
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read scheme translations from {self.path}: {e}")
+            return
+        with self._lock:
+            self._data = data if isinstance(data, dict) else {}
+            self.version += 1
+
+    def save(self):
+        with self._lock:
+            snapshot = json.dumps(self._data, ensure_ascii=False, indent=1)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=f"{os.path.basename(self.path)}.", suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.path)
+
+    def get_translations(self, scheme_id, language=None):
+        """Returns {language: {field: text}} for a scheme, or one language's fields."""
+        with self._lock:
+            entry = self._data.get(scheme_id)
+            translations = dict(entry['translations']) if entry else {}
+        if language:
+            return translations.get(language, {})
+        return translations
+
+    def is_stale(self, scheme, languages, fields=TRANSLATABLE_FIELDS):
+        with self._lock:
+            entry = self._data.get(scheme['id'])
+            if not entry or entry.get('lastUpdated') != scheme.get('lastUpdated'):
+                return True
+            translations = entry.get('translations', {})
+            for language in languages:
+                stored = translations.get(language, {})
+                if any(scheme.get(field) and not stored.get(field) for field in fields):
+                    return True
+        return False
+
+    def build(self, schemes=None, languages=None, force=False):
+        """
+        Translates every stale scheme into every language and persists the result.
+        Returns:
+            int: Number of schemes rebuilt.
+        """
+        import utils
+
+        schemes = GOVERNMENT_SCHEMES if schemes is None else schemes
+        languages = list(utils.SUPPORTED_LANGUAGES.keys()) if languages is None else list(languages)
+
+        with self._build_lock:
+            rebuilt = 0
+            for scheme in schemes:
+                if not force and not self.is_stale(scheme, languages):
+                    continue
+
+                fields = [field for field in TRANSLATABLE_FIELDS if scheme.get(field)]
+                texts = [scheme[field] for field in fields]
+                logging.info(f"Translating scheme '{scheme['id']}' ({len(fields)} fields x {len(languages)} languages)...")
+                results = utils.translate_many(texts, 'en', languages)
+
+                translations = {}
+                for language, pairs in results.items():
+                    translated = {field: text for field, (text, err) in zip(fields, pairs) if text and not err}
+                    if translated:
+                        translations[language] = translated
+
+                with self._lock:
+                    self._data[scheme['id']] = {
+                        'lastUpdated': scheme.get('lastUpdated'),
+                        'translations': translations,
+                    }
+                    self.version += 1
+                self.save()
+                rebuilt += 1
+
+            known_ids = {scheme['id'] for scheme in GOVERNMENT_SCHEMES}
+            with self._lock:
+                removed = [scheme_id for scheme_id in self._data if scheme_id not in known_ids]
+                for scheme_id in removed:
+                    del self._data[scheme_id]
+                if removed:
+                    self.version += 1
+            if removed:
+                self.save()
+
+        logging.info(f"Scheme translations up to date ({rebuilt} rebuilt).")
+        return rebuilt
+
+    def start_background_build(self, **kwargs):
+        """
+        Runs build() on a daemon thread so startup is not blocked. App worker
+        processes take turns on <path>.build.lock: the first one translates, the
+        rest reload its results and find nothing stale.
+        """
+        def _run():
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                lock_file = acquire_process_lock(f"{self.path}.build.lock", blocking=True)
+                try:
+                    self.load()
+                    self.build(**kwargs)
+                finally:
+                    lock_file.close()
+            except Exception as e:
+                logging.error(f"Background scheme translation failed: {e}")
+                import traceback
+                traceback.print_exc()
+
+        thread = threading.Thread(target=_run, name="scheme-translations", daemon=True)
+        thread.start()
+        return thread
+
+
+if __name__ == "__main__":
+    import argparse
+    import utils
+
+    parser = argparse.ArgumentParser(description="Precompute translations for government schemes.")
+    parser.add_argument('--force', action='store_true', help="Retranslate every scheme, even if unchanged.")
+    parser.add_argument('--languages', nargs='*', help="Friendly language names (default: all supported).")
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, help="Path of the JSON translation store.")
+    args = parser.parse_args()
+
+    utils.init_translation_cache(os.path.join('instance', 'translations.db'))
+    store = SchemeTranslationStore(args.store)
+    count = store.build(languages=args.languages, force=args.force)
+    print(f"Rebuilt translations for {count} scheme(s) into {args.store}.")
@@ -285,19 +285,17 @@ GOVERNMENT_SCHEMES = [
     }
 ]
 
+_SCHEMES_BY_ID = {scheme['id']: scheme for scheme in GOVERNMENT_SCHEMES}
+
 def get_schemes(limit=None):
-    """Get government schemes, optionally limited to a specific count"""
-    schemes = GOVERNMENT_SCHEMES.copy()
+    """Get government schemes, optionally limited to a specific count (shared list; do not mutate)"""
     if limit:
-        return schemes[:limit]
-    return schemes
+        return GOVERNMENT_SCHEMES[:limit]
+    return GOVERNMENT_SCHEMES
 
 def get_scheme_by_id(scheme_id):
     """Get a specific scheme by its ID"""
-    for scheme in GOVERNMENT_SCHEMES:
-        if scheme['id'] == scheme_id:
-            return scheme
-    return None
+    return _SCHEMES_BY_ID.get(scheme_id)
 
 def get_daily_schemes(count=3):
     """Get schemes for daily display (rotates based on date)"""
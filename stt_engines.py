@@ -0,0 +1,119 @@
+# stt_engines.py - Pluggable speech-to-text engines behind utils.perform_stt
+import logging
+import os
+
+import stt_pipeline
+
+MODEL_SIZES = ('tiny', 'base', 'small')
+
+# Rough CPU real-time factors (processing seconds per audio second) used to pick
+# the largest model that fits a latency budget. Tune with benchmark.py --stages stt.
+REAL_TIME_FACTORS = {
+    'whisper': {'tiny': 0.08, 'base': 0.15, 'small': 0.45},
+    'faster-whisper': {'tiny': 0.03, 'base': 0.05, 'small': 0.15},
+}
+
+
+class STTEngine:
+    """One loaded speech model; transcribe() takes a decoded 16 kHz float32 buffer."""
+    name = None
+
+    def __init__(self, model_size):
+        if model_size not in MODEL_SIZES:
+            raise ValueError(f"Unknown STT model size '{model_size}'. Choose from: {list(MODEL_SIZES)}")
+        self.model_size = model_size
+
+    def load(self):
+        raise NotImplementedError
+
+    def transcribe(self, audio, language_hint=None):
+        """Returns (text, short_language_code)."""
+        raise NotImplementedError
+
+
+class WhisperEngine(STTEngine):
+    """openai-whisper in fp32 PyTorch, with the silence-gated batched pipeline."""
+    name = 'whisper'
+
+    def __init__(self, model_size, chunked=True, batch_size=8, window_seconds=30):
+        super().__init__(model_size)
+        self.chunked = chunked
+        self.batch_size = batch_size
+        self.window_seconds = window_seconds
+
+    def load(self):
+        import whisper
+        self.model = whisper.load_model(self.model_size)
+
+    def transcribe(self, audio, language_hint=None):
+        if self.chunked:
+            return stt_pipeline.transcribe_chunked(
+                self.model,
+                audio,
+                language_hint=language_hint,
+                batch_size=self.batch_size,
+                max_window_seconds=self.window_seconds,
+            )
+        result = self.model.transcribe(audio, fp16=False, language=language_hint)
+        return result['text'], result['language']
+
+
+class FasterWhisperEngine(STTEngine):
+    """CTranslate2-based faster-whisper with int8 weights and built-in VAD on CPU."""
+    name = 'faster-whisper'
+
+    def __init__(self, model_size, compute_type=None, **_):
+        super().__init__(model_size)
+        self.compute_type = compute_type or os.environ.get('FASTER_WHISPER_COMPUTE_TYPE', 'int8')
+
+    def load(self):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(
+            self.model_size,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=int(os.environ.get('FASTER_WHISPER_THREADS', '0')),
+        )
+
+    def transcribe(self, audio, language_hint=None):
+        segments, info = self.model.transcribe(
+            audio,
+            language=language_hint,
+            beam_size=1,
+            vad_filter=True,
+            condition_on_previous_text=False,
+        )
+        # segments is lazy; joining it runs the decode
+        text = ' '.join(segment.text.strip() for segment in segments)
+        return text, info.language
+
+
+ENGINES = {
+    engine.name: engine
+    for engine in (WhisperEngine, FasterWhisperEngine)
+}
+
+
+def create_engine(name, model_size, **options):
+    """Instantiates (but does not load) the STT engine registered under name."""
+    engine_cls = ENGINES.get(name)
+    if engine_cls is None:
+        raise ValueError(f"Unknown STT engine '{name}'. Choose from: {sorted(ENGINES)}")
+    return engine_cls(model_size, **options)
+
+
+def select_model_size(engine_name, audio_seconds, latency_budget_ms, default='base'):
+    """
+    Largest model whose estimated processing time fits latency_budget_ms,
+    falling back to 'tiny' when even that is too slow.
+    """
+    if not latency_budget_ms:
+        return default
+    factors = REAL_TIME_FACTORS.get(engine_name, REAL_TIME_FACTORS['whisper'])
+    budget_seconds = latency_budget_ms / 1000.0
+    chosen = 'tiny'
+    for size in MODEL_SIZES:
+        if factors[size] * audio_seconds <= budget_seconds:
+            chosen = size
+    logging.debug(f"STT model size for {audio_seconds:.1f}s audio within {latency_budget_ms}ms: {chosen}")
+    return chosen
@@ -0,0 +1,144 @@
+# stt_pipeline.py - Decode once, drop silence, transcribe windows in batches, stitch
+import logging
+import subprocess
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def decode_audio(audio, sample_rate=SAMPLE_RATE):
+    """
+    Decodes ffmpeg-readable audio into a mono float32 16 kHz numpy buffer.
+    audio is a file path, or the encoded bytes themselves (piped through stdin).
+    """
+    in_memory = isinstance(audio, (bytes, bytearray))
+    cmd = [
+        "ffmpeg", "-threads", "0", "-i", "pipe:0" if in_memory else audio,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-",
+    ]
+    if not in_memory:
+        cmd.insert(1, "-nostdin")
+    try:
+        out = subprocess.run(cmd, input=bytes(audio) if in_memory else None, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')[-300:]}") from e
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def voiced_regions(audio, sample_rate=SAMPLE_RATE, frame_ms=30, threshold_ratio=3.0, min_rms=0.005,
+                   min_silence_ms=500, pad_ms=200):
+    """
+    Energy gate: frames whose RMS is above threshold_ratio x the noise floor
+    (10th percentile frame energy) count as speech. Gaps shorter than
+    min_silence_ms are bridged and each region is padded by pad_ms.
+    Returns:
+        list[tuple]: (start_sample, end_sample) of each voiced region.
+    """
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    energies = np.sqrt(np.mean(frames ** 2, axis=1))
+    threshold = max(min_rms, float(np.percentile(energies, 10)) * threshold_ratio)
+    voiced = energies > threshold
+
+    regions = []
+    start = None
+    for i, is_voiced in enumerate(voiced):
+        if is_voiced and start is None:
+            start = i
+        elif not is_voiced and start is not None:
+            regions.append([start, i])
+            start = None
+    if start is not None:
+        regions.append([start, n_frames])
+
+    max_gap = max(1, int(min_silence_ms / frame_ms))
+    merged = []
+    for region in regions:
+        if merged and region[0] - merged[-1][1] < max_gap:
+            merged[-1][1] = region[1]
+        else:
+            merged.append(region)
+
+    pad = int(sample_rate * pad_ms / 1000)
+    return [(max(0, s * frame - pad), min(len(audio), e * frame + pad)) for s, e in merged]
+
+
+def make_windows(audio, regions, sample_rate=SAMPLE_RATE, max_window_seconds=30):
+    """
+    Packs consecutive voiced regions into windows no longer than Whisper's
+    30 s context; longer regions are cut into max-length pieces.
+    Returns:
+        list[np.ndarray]: Audio windows in order.
+    """
+    max_len = int(sample_rate * max_window_seconds)
+    windows = []
+    current = []
+    current_len = 0
+    for start, end in regions:
+        while end - start > max_len:
+            if current:
+                windows.append(np.concatenate(current))
+                current, current_len = [], 0
+            windows.append(audio[start:start + max_len])
+            start += max_len
+        piece = audio[start:end]
+        if current_len + len(piece) > max_len and current:
+            windows.append(np.concatenate(current))
+            current, current_len = [], 0
+        current.append(piece)
+        current_len += len(piece)
+    if current:
+        windows.append(np.concatenate(current))
+    return windows
+
+
+def detect_language(model, window):
+    """Whisper language ID on one window; returns a short code like 'hi'."""
+    import whisper
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(window), model.dims.n_mels).to(model.device)
+    _, probs = model.detect_language(mel)
+    return max(probs, key=probs.get)
+
+
+def transcribe_windows(model, windows, language, batch_size=8):
+    """Decodes the windows batch_size at a time with one batched forward pass per batch."""
+    import torch
+    import whisper
+
+    options = whisper.DecodingOptions(language=language, fp16=False, without_timestamps=True)
+    texts = []
+    for start in range(0, len(windows), batch_size):
+        batch = windows[start:start + batch_size]
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(window), model.dims.n_mels)
+            for window in batch
+        ]).to(model.device)
+        with torch.inference_mode():
+            results = whisper.decode(model, mel, options)
+        texts.extend(result.text.strip() for result in results)
+    return texts
+
+
+def transcribe_chunked(model, audio, language_hint=None, batch_size=8, max_window_seconds=30, **vad_options):
+    """
+    Silence-gated, windowed transcription of a decoded buffer.
+    The language is detected from the first window unless a hint is given.
+    Returns:
+        tuple: (text, language)
+    """
+    regions = voiced_regions(audio, **vad_options)
+    if not regions:
+        logging.warning("No speech found in audio.")
+        return "", language_hint
+    windows = make_windows(audio, regions, max_window_seconds=max_window_seconds)
+    voiced_seconds = sum(len(w) for w in windows) / SAMPLE_RATE
+    logging.debug(f"STT: {len(audio) / SAMPLE_RATE:.1f}s audio -> {len(windows)} window(s), {voiced_seconds:.1f}s voiced.")
+
+    language = language_hint or detect_language(model, windows[0])
+    texts = transcribe_windows(model, windows, language, batch_size=batch_size)
+    return ' '.join(text for text in texts if text), language
@@ -0,0 +1,82 @@
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import jobs
+from jobs import validate_callback_url
+
+
+@pytest.mark.parametrize("url", [
+    "http://169.254.169.254/latest/meta-data/",
+    "http://localhost:5000/hook",
+    "http://127.0.0.1/hook",
+    "http://10.0.0.5/hook",
+    "http://192.168.1.10:8080/hook",
+    "http://[::1]/hook",
+    "ftp://example.com/hook",
+    "http:///no-host",
+])
+def test_rejects_non_public_callback_urls(url):
+    with pytest.raises(ValueError):
+        validate_callback_url(url, allowed_hosts=set())
+
+
+def test_allowlisted_host_is_accepted():
+    validate_callback_url("http://localhost:5000/hook", allowed_hosts={"localhost"})
+
+
+def test_public_address_is_accepted():
+    validate_callback_url("https://93.184.216.34/hook", allowed_hosts=set())
+
+
+class _Recorder(BaseHTTPRequestHandler):
+    """Answers POSTs with the server's configured status/Location and records what it got."""
+
+    def do_POST(self):
+        self.server.requests.append((self.path, self.headers.get('Host'), self.rfile.read(int(self.headers['Content-Length']))))
+        self.send_response(self.server.status)
+        if self.server.location:
+            self.send_header('Location', self.server.location)
+        self.end_headers()
+
+    do_GET = do_POST
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    servers = []
+
+    def start(status=204, location=None):
+        server = HTTPServer(('127.0.0.1', 0), _Recorder)
+        server.status, server.location, server.requests = status, location, []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_redirecting_callback_is_not_followed(http_server, monkeypatch):
+    internal = http_server()
+    public = http_server(status=302, location=f"http://127.0.0.1:{internal.server_port}/metadata")
+    monkeypatch.setattr(jobs, 'JOB_CALLBACK_ALLOWED_HOSTS', {'127.0.0.1'})
+    with pytest.raises(urllib.error.HTTPError):
+        jobs.post_callback(f"http://127.0.0.1:{public.server_port}/hook", b'{}')
+    assert len(public.requests) == 1
+    assert internal.requests == []
+
+
+def test_callback_connects_to_the_validated_address(http_server, monkeypatch):
+    server = http_server()
+    # DNS would now answer differently; the connection must still go to the address that was checked
+    monkeypatch.setattr(jobs, 'validate_callback_url', lambda url: '127.0.0.1')
+    url = f"http://hooks.example.com:{server.server_port}/hook"
+    assert jobs.post_callback(url, b'{"ok": true}') == 204
+    assert server.requests == [('/hook', f"hooks.example.com:{server.server_port}", b'{"ok": true}')]
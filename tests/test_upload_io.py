@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from upload_io import apply_orientation, decode_image, exif_orientation
+
+
+def _exif_segment(orientation, byteorder='big'):
+    """APP1 segment holding a one-entry IFD0 with the Orientation tag."""
+    mark = b'MM' if byteorder == 'big' else b'II'
+    tiff = (
+        mark
+        + (42).to_bytes(2, byteorder)
+        + (8).to_bytes(4, byteorder)
+        + (1).to_bytes(2, byteorder)
+        + (0x0112).to_bytes(2, byteorder)  # Orientation
+        + (3).to_bytes(2, byteorder)  # SHORT
+        + (1).to_bytes(4, byteorder)
+        + orientation.to_bytes(2, byteorder) + b'\x00\x00'
+        + (0).to_bytes(4, byteorder)
+    )
+    payload = b'Exif\x00\x00' + tiff
+    return b'\xff\xe1' + (len(payload) + 2).to_bytes(2, 'big') + payload
+
+
+def _with_exif(jpeg, orientation, byteorder='big'):
+    return jpeg[:2] + _exif_segment(orientation, byteorder) + jpeg[2:]
+
+
+@pytest.mark.parametrize("byteorder", ['big', 'little'])
+def test_exif_orientation_is_read_from_app1(byteorder):
+    jpeg = b'\xff\xd8' + b'\xff\xda\x00\x02' + b'\xff\xd9'
+    assert exif_orientation(_with_exif(jpeg, 6, byteorder)) == 6
+    assert exif_orientation(jpeg) == 1
+    assert exif_orientation(b'not a jpeg') == 1
+
+
+def test_apply_orientation_makes_image_upright():
+    image = np.arange(6).reshape(2, 3)
+    assert apply_orientation(image, 1) is image
+    assert apply_orientation(image, 6).tolist() == [[3, 0], [4, 1], [5, 2]]
+    assert apply_orientation(image, 8).tolist() == [[2, 5], [1, 4], [0, 3]]
+    assert apply_orientation(image, 3).tolist() == [[5, 4, 3], [2, 1, 0]]
+
+
+def test_decode_image_applies_exif_rotation():
+    cv2 = pytest.importorskip('cv2')
+    # A wide image with a bright left edge, stored sideways with Orientation=6 (rotate 90 CW)
+    stored = np.zeros((40, 80, 3), np.uint8)
+    stored[:, :10] = 255
+    ok, encoded = cv2.imencode('.jpg', stored)
+    assert ok
+    upright = decode_image(_with_exif(encoded.tobytes(), 6))
+    assert upright.shape[:2] == (80, 40)
+    # The stored left edge becomes the top edge once rotated
+    assert upright[:10].mean() > 200 and upright[-10:].mean() < 50
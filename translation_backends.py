@@ -0,0 +1,250 @@
+# translation_backends.py - Pluggable inference backends for the shared NLLB model
+#
+# Side-by-side latency/quality report:
+#   python translation_backends.py --compare torch torch-int8 ctranslate2
+import logging
+import os
+import threading
+import time
+
+
+class TranslationBackend:
+    """
+    One loaded NLLB model behind a common translate() call.
+    The language pair is chosen per call, so one instance serves every pair.
+    """
+    name = None
+
+    def __init__(self, model_name_or_path):
+        self.model_name_or_path = model_name_or_path
+        self.tokenizer = None
+        self._tokenizer_lock = threading.Lock()
+
+    def load(self):
+        raise NotImplementedError
+
+    def translate(self, texts, source_lang_code, target_lang_code, max_length=512):
+        """Returns translations of texts in order."""
+        raise NotImplementedError
+
+    def after_fork(self):
+        """Called in forked inference workers; locks held by other parent threads are replaced."""
+        self._tokenizer_lock = threading.Lock()
+
+    def _load_tokenizer(self):
+        from transformers import AutoTokenizer
+        logging.info(f"Loading tokenizer for: {self.model_name_or_path}")
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name_or_path, token=False)
+
+    def _encode(self, texts, source_lang_code, max_length, return_tensors="pt"):
+        # src_lang is mutable tokenizer state shared by every pair, so encoding is serialised.
+        with self._tokenizer_lock:
+            self.tokenizer.src_lang = source_lang_code
+            return self.tokenizer(texts, return_tensors=return_tensors, padding=True, truncation=True, max_length=max_length)
+
+
+class TorchBackend(TranslationBackend):
+    """fp32 PyTorch on CPU (the original behaviour)."""
+    name = 'torch'
+
+    def load(self):
+        from transformers import AutoModelForSeq2SeqLM
+        self._load_tokenizer()
+
+        # Monkey-patch transformers to bypass PyTorch 2.6 CVE block for legacy .bin models
+        import transformers.utils.import_utils  # type: ignore
+        if hasattr(transformers.utils.import_utils, "check_torch_load_is_safe"):
+            transformers.utils.import_utils.check_torch_load_is_safe = lambda: None
+
+        logging.info(f"Loading shared translation model: {self.model_name_or_path}")
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(
+            self.model_name_or_path,
+            use_safetensors=False,
+            device_map={"": "cpu"}
+        )
+        self.model.eval()
+
+    def translate(self, texts, source_lang_code, target_lang_code, max_length=512):
+        import torch
+        inputs = self._encode(texts, source_lang_code, max_length)
+        forced_bos_token_id = self.tokenizer.convert_tokens_to_ids(target_lang_code)
+        with torch.inference_mode():
+            output_ids = self.model.generate(
+                **inputs,
+                forced_bos_token_id=forced_bos_token_id,
+                max_length=max_length,
+            )
+        return self.tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """PyTorch with every nn.Linear dynamically quantized to int8 after loading."""
+    name = 'torch-int8'
+
+    def load(self):
+        import torch
+        super().load()
+        logging.info("Applying dynamic int8 quantization to Linear layers...")
+        self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model.eval()
+
+
+class CTranslate2Backend(TranslationBackend):
+    """
+    CTranslate2 int8 engine. The converted model is read from CT2_MODEL_DIR and
+    converted from the Hugging Face checkpoint on first use if it is missing.
+    """
+    name = 'ctranslate2'
+
+    def __init__(self, model_name_or_path):
+        super().__init__(model_name_or_path)
+        self.converted_dir = os.environ.get('CT2_MODEL_DIR', os.path.join("models", "nllb-200-distilled-600M-ct2-int8"))
+        self.compute_type = os.environ.get('CT2_COMPUTE_TYPE', 'int8')
+
+    def load(self):
+        import ctranslate2
+        self._load_tokenizer()
+        if not os.path.isdir(self.converted_dir):
+            from ctranslate2.converters import TransformersConverter
+            logging.info(f"Converting {self.model_name_or_path} to CTranslate2 ({self.compute_type}) at {self.converted_dir}...")
+            TransformersConverter(self.model_name_or_path).convert(self.converted_dir, quantization=self.compute_type)
+        self.translator = ctranslate2.Translator(
+            self.converted_dir,
+            device="cpu",
+            compute_type=self.compute_type,
+            intra_threads=int(os.environ.get('CT2_THREADS', '0')),
+        )
+
+    def translate(self, texts, source_lang_code, target_lang_code, max_length=512):
+        encoded = self._encode(texts, source_lang_code, max_length, return_tensors=None)
+        sources = [self.tokenizer.convert_ids_to_tokens(ids) for ids in encoded['input_ids']]
+        # Padding is not needed: CTranslate2 batches variable-length token lists itself.
+        sources = [[token for token in tokens if token != self.tokenizer.pad_token] for tokens in sources]
+        results = self.translator.translate_batch(
+            sources,
+            target_prefix=[[target_lang_code]] * len(sources),
+            max_decoding_length=max_length,
+        )
+        translations = []
+        for result in results:
+            tokens = result.hypotheses[0][1:]  # Drop the forced target language tag
+            translations.append(self.tokenizer.decode(self.tokenizer.convert_tokens_to_ids(tokens), skip_special_tokens=True))
+        return translations
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (TorchBackend, QuantizedTorchBackend, CTranslate2Backend)
+}
+
+
+def create_backend(name, model_name_or_path):
+    """Instantiates (but does not load) the backend registered under name."""
+    backend_cls = BACKENDS.get(name)
+    if backend_cls is None:
+        raise ValueError(f"Unknown translation backend '{name}'. Choose from: {sorted(BACKENDS)}")
+    return backend_cls(model_name_or_path)
+
+
+def _chrf(hypothesis, reference, n=6):
+    """Character n-gram F-score (chrF, beta=2) used as a cheap agreement metric."""
+    from collections import Counter
+    hypothesis, reference = hypothesis.replace(' ', ''), reference.replace(' ', '')
+    precisions, recalls = [], []
+    for order in range(1, n + 1):
+        hyp = Counter(hypothesis[i:i + order] for i in range(len(hypothesis) - order + 1))
+        ref = Counter(reference[i:i + order] for i in range(len(reference) - order + 1))
+        if not hyp or not ref:
+            continue
+        overlap = sum((hyp & ref).values())
+        precisions.append(overlap / sum(hyp.values()))
+        recalls.append(overlap / sum(ref.values()))
+    if not precisions:
+        return 0.0
+    p, r = sum(precisions) / len(precisions), sum(recalls) / len(recalls)
+    return 0.0 if p + r == 0 else 100 * 5 * p * r / (4 * p + r)
+
+
+COMPARISON_SENTENCES = [
+    "Direct income support of 6000 rupees per year is given to all farmers with cultivable land.",
+    "Comprehensive crop insurance covers losses from sowing to harvest at low premium rates.",
+    "Get detailed soil analysis and fertilizer recommendations for a better yield.",
+    "The scheme provides credit to farmers at four percent interest.",
+    "Farmers can install solar pumps and sell surplus power to the grid.",
+    "Please bring your land records and bank passbook to the nearest office.",
+    "Payments are made in three equal installments directly into the bank account.",
+    "Applications close at the end of this month.",
+]
+
+
+def compare_backends(names, target_lang_codes=("hin_Deva", "tam_Taml"), batch_size=8, repeats=3):
+    """
+    Loads each backend in turn and reports load time, resident memory growth,
+    per-batch latency and chrF agreement with the first backend's output.
+    """
+    import gc
+    import utils
+    from ocr_readers import _current_rss_mb
+
+    model_name_or_path = utils._resolve_translation_model_path()
+    sentences = COMPARISON_SENTENCES[:batch_size]
+    reference = {}
+    report = []
+
+    for name in names:
+        gc.collect()
+        rss_before = _current_rss_mb()
+        started = time.perf_counter()
+        backend = create_backend(name, model_name_or_path)
+        backend.load()
+        load_seconds = time.perf_counter() - started
+        rss_after = _current_rss_mb()
+
+        latencies, outputs = [], {}
+        for target in target_lang_codes:
+            backend.translate(sentences[:1], "eng_Latn", target)  # Warm-up
+            for _ in range(repeats):
+                started = time.perf_counter()
+                outputs[target] = backend.translate(sentences, "eng_Latn", target)
+                latencies.append(time.perf_counter() - started)
+
+        if not reference:
+            reference = outputs
+        scores = [
+            _chrf(hyp, ref)
+            for target in target_lang_codes
+            for hyp, ref in zip(outputs[target], reference[target])
+        ]
+        report.append({
+            'backend': name,
+            'load_seconds': round(load_seconds, 2),
+            'rss_growth_mb': round(rss_after - rss_before, 1) if rss_before is not None and rss_after is not None else None,
+            'batch_latency_ms_mean': round(1000 * sum(latencies) / len(latencies), 1),
+            'batch_latency_ms_min': round(1000 * min(latencies), 1),
+            'chrf_vs_reference': round(sum(scores) / len(scores), 1),
+            'reference': names[0],
+        })
+        del backend
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Compare translation backends side by side.")
+    parser.add_argument('--compare', nargs='+', default=['torch', 'torch-int8'], choices=sorted(BACKENDS),
+                        help="Backends to compare; the first one is the quality reference.")
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--json', help="Also write the report to this file.")
+    args = parser.parse_args()
+
+    report = compare_backends(args.compare, batch_size=args.batch_size, repeats=args.repeats)
+    print(f"{'backend':<14}{'load s':>8}{'RSS MB':>9}{'mean ms':>10}{'min ms':>9}{'chrF':>7}")
+    for row in report:
+        print(f"{row['backend']:<14}{row['load_seconds']:>8}{str(row['rss_growth_mb']):>9}"
+              f"{row['batch_latency_ms_mean']:>10}{row['batch_latency_ms_min']:>9}{row['chrf_vs_reference']:>7}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,126 @@
+# translation_batcher.py - Dynamic micro-batching in front of the shared translation model
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class _PendingTranslation:
+    __slots__ = ('text', 'source_lang_code', 'target_lang_code', 'future')
+
+    def __init__(self, text, source_lang_code, target_lang_code):
+        self.text = text
+        self.source_lang_code = source_lang_code
+        self.target_lang_code = target_lang_code
+        self.future = Future()
+
+
+class TranslationBatcher:
+    """
+    Collects translation requests for a few milliseconds, groups them by
+    language pair and runs one padded generate call per group.
+    Callers get a Future that resolves to the translated string.
+    """
+
+    def __init__(self, translate_batch_fn, max_batch_size=16, max_wait_ms=10, dispatch_workers=1):
+        """
+        Args:
+            translate_batch_fn (callable): fn(texts, source_lang_code, target_lang_code) -> list[str].
+            max_batch_size (int): Largest number of texts sent to the model in one call.
+            max_wait_ms (float): How long the first request of a batch waits for company.
+            dispatch_workers (int): Batches run concurrently (>1 only helps with a process pool).
+        """
+        self.translate_batch_fn = translate_batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._executor = ThreadPoolExecutor(max_workers=dispatch_workers, thread_name_prefix="translation-dispatch") if dispatch_workers > 1 else None
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="translation-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text, source_lang_code, target_lang_code):
+        """Queues one text and returns a Future for its translation."""
+        if self._stopped.is_set():
+            raise RuntimeError("Translation batcher has been stopped.")
+        item = _PendingTranslation(text, source_lang_code, target_lang_code)
+        self._queue.put(item)
+        return item.future
+
+    def translate(self, text, source_lang_code, target_lang_code, timeout=None):
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(text, source_lang_code, target_lang_code).result(timeout=timeout)
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stop(self, timeout=5):
+        self._stopped.set()
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+
+    def _collect(self):
+        """Blocks for the first request, then gathers more until the wait or size limit is hit."""
+        first = self._queue.get()
+        if first is None:
+            return None
+        pending = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._stopped.set()
+                break
+            pending.append(item)
+        return pending
+
+    def _run(self):
+        while not self._stopped.is_set():
+            pending = self._collect()
+            if pending is None:
+                break
+
+            groups = {}
+            for item in pending:
+                groups.setdefault((item.source_lang_code, item.target_lang_code), []).append(item)
+
+            for (source_lang_code, target_lang_code), items in groups.items():
+                # Similar lengths in one batch keep padding waste low.
+                items.sort(key=lambda i: len(i.text))
+                for start in range(0, len(items), self.max_batch_size):
+                    chunk = items[start:start + self.max_batch_size]
+                    if self._executor is not None:
+                        self._executor.submit(self._dispatch, chunk, source_lang_code, target_lang_code)
+                    else:
+                        self._dispatch(chunk, source_lang_code, target_lang_code)
+
+        # Fail anything still queued so no caller blocks forever.
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and not item.future.done():
+                item.future.set_exception(RuntimeError("Translation batcher stopped."))
+
+    def _dispatch(self, items, source_lang_code, target_lang_code):
+        texts = [item.text for item in items]
+        logging.debug(f"Batcher dispatching {len(texts)} text(s): {source_lang_code} -> {target_lang_code}")
+        try:
+            translations = self.translate_batch_fn(texts, source_lang_code, target_lang_code)
+            if len(translations) != len(items):
+                raise Exception(f"Expected {len(items)} translations, got {len(translations)}.")
+        except Exception as e:
+            logging.error(f"Batched translation failed ({source_lang_code} -> {target_lang_code}): {e}")
+            for item in items:
+                item.future.set_exception(e)
+            return
+        for item, translation in zip(items, translations):
+            item.future.set_result(translation)
@@ -0,0 +1,179 @@
+# translation_cache.py - Two-tier translation cache keyed by (text, source, target)
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_cache_key(text, source_lang_code, target_lang_code):
+    """Content address for one translation: sha256 over source code, target code and text."""
+    payload = f"{source_lang_code}\x1f{target_lang_code}\x1f{text}".encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+class TranslationCache:
+    """
+    In-process LRU tier in front of a durable SQLite tier.
+    The SQLite tier lives in its own table inside the instance database and is
+    trimmed to max_db_entries by least-recent use.
+    """
+
+    def __init__(self, db_path=None, max_memory_entries=4096, max_db_entries=200000):
+        self.db_path = db_path
+        self.max_memory_entries = max(1, int(max_memory_entries))
+        self.max_db_entries = max(1, int(max_db_entries))
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._puts_since_trim = 0
+        self.stats_counters = {
+            'memory_hits': 0,
+            'db_hits': 0,
+            'misses': 0,
+            'puts': 0,
+            'memory_evictions': 0,
+            'db_evictions': 0,
+        }
+        if self.db_path:
+            self._ensure_table()
+
+    # --- SQLite tier ---
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            self._local.conn = conn
+        return conn
+
+    def _ensure_table(self):
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS translation_cache ("
+            " cache_key TEXT PRIMARY KEY,"
+            " source_language TEXT NOT NULL,"
+            " target_language TEXT NOT NULL,"
+            " source_text TEXT NOT NULL,"
+            " translated_text TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used_at REAL NOT NULL,"
+            " hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_translation_cache_last_used ON translation_cache (last_used_at)")
+        conn.commit()
+
+    def _db_get(self, key):
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT translated_text FROM translation_cache WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE translation_cache SET last_used_at = ?, hits = hits + 1 WHERE cache_key = ?",
+                (time.time(), key),
+            )
+            conn.commit()
+            return row[0]
+        except sqlite3.Error as e:
+            logging.warning(f"Translation cache read failed: {e}")
+            return None
+
+    def _db_put(self, key, text, source_lang_code, target_lang_code, translated_text):
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO translation_cache"
+                " (cache_key, source_language, target_language, source_text, translated_text, created_at, last_used_at, hits)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, source_lang_code, target_lang_code, text, translated_text, now, now),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Translation cache write failed: {e}")
+            return
+
+        self._puts_since_trim += 1
+        # Counting rows on every write is wasteful; trim periodically instead.
+        if self._puts_since_trim >= 256:
+            self._puts_since_trim = 0
+            self._trim_db()
+
+    def _trim_db(self):
+        try:
+            conn = self._connection()
+            (count,) = conn.execute("SELECT COUNT(*) FROM translation_cache").fetchone()
+            excess = count - self.max_db_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM translation_cache WHERE cache_key IN ("
+                    " SELECT cache_key FROM translation_cache ORDER BY last_used_at ASC LIMIT ?)",
+                    (excess,),
+                )
+                conn.commit()
+                with self._lock:
+                    self.stats_counters['db_evictions'] += excess
+                logging.info(f"Translation cache evicted {excess} durable entries.")
+        except sqlite3.Error as e:
+            logging.warning(f"Translation cache trim failed: {e}")
+
+    # --- Public API ---
+
+    def _remember(self, key, translated_text):
+        with self._lock:
+            self._memory[key] = translated_text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+                self.stats_counters['memory_evictions'] += 1
+
+    def get(self, text, source_lang_code, target_lang_code):
+        """Returns the cached translation or None."""
+        key = make_cache_key(text, source_lang_code, target_lang_code)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                self.stats_counters['memory_hits'] += 1
+                return cached
+
+        cached = self._db_get(key) if self.db_path else None
+        if cached is not None:
+            self._remember(key, cached)
+            with self._lock:
+                self.stats_counters['db_hits'] += 1
+            return cached
+
+        with self._lock:
+            self.stats_counters['misses'] += 1
+        return None
+
+    def put(self, text, source_lang_code, target_lang_code, translated_text):
+        if not text or not translated_text:
+            return
+        key = make_cache_key(text, source_lang_code, target_lang_code)
+        self._remember(key, translated_text)
+        with self._lock:
+            self.stats_counters['puts'] += 1
+        if self.db_path:
+            self._db_put(key, text, source_lang_code, target_lang_code, translated_text)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.db_path:
+            conn = self._connection()
+            conn.execute("DELETE FROM translation_cache")
+            conn.commit()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.stats_counters)
+            counters['memory_entries'] = len(self._memory)
+        lookups = counters['memory_hits'] + counters['db_hits'] + counters['misses']
+        counters['hit_rate'] = round((counters['memory_hits'] + counters['db_hits']) / lookups, 4) if lookups else 0.0
+        counters['max_memory_entries'] = self.max_memory_entries
+        counters['max_db_entries'] = self.max_db_entries if self.db_path else 0
+        return counters
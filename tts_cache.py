@@ -0,0 +1,118 @@
+# tts_cache.py - On-disk TTS audio cache keyed by content hash, trimmed by total bytes (LRU)
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+MIMETYPES = {'mp3': 'audio/mpeg', 'wav': 'audio/wav', 'ogg': 'audio/ogg'}
+
+
+def make_tts_key(text, lang, engine, voice):
+    """
+    Content address for one utterance: sha256 over language, engine, voice and
+    whitespace-normalised text, so audio from a fallback engine never stands in
+    for the preferred engine's clip.
+    """
+    payload = f"{lang}\x1f{engine}\x1f{voice}\x1f{' '.join(text.split())}".encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+class TTSAudioCache:
+    """
+    Stores each synthesized clip as <key>.<ext> in one directory.
+    Recency is kept in memory (seeded from file mtimes at startup, and
+    refreshed on disk on every hit) and the least recently used files are
+    deleted once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max(1, int(max_bytes))
+        self._entries = OrderedDict()  # key -> (filename, size), oldest first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.stats_counters = {'hits': 0, 'misses': 0, 'puts': 0, 'evictions': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        found = []
+        for filename in os.listdir(self.directory):
+            key, _, extension = filename.partition('.')
+            if extension == 'tmp':
+                os.remove(os.path.join(self.directory, filename))  # Interrupted write
+                continue
+            if extension not in MIMETYPES:
+                continue
+            stat = os.stat(os.path.join(self.directory, filename))
+            found.append((stat.st_mtime, key, filename, stat.st_size))
+        for _, key, filename, size in sorted(found):
+            # The same key under another extension is an older clip that put() did not get to remove
+            previous = self._drop(key)
+            if previous is not None:
+                self._remove_file(previous[0])
+            self._entries[key] = (filename, size)
+            self._total_bytes += size
+        logging.info(f"TTS cache: {len(self._entries)} clip(s), {self._total_bytes / (1024 * 1024):.1f} MB in {self.directory}")
+
+    def get(self, key):
+        """Returns (path, mimetype) for a cached clip, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats_counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats_counters['hits'] += 1
+        filename = entry[0]
+        path = os.path.join(self.directory, filename)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._drop(key)
+            return None
+        return path, MIMETYPES[filename.partition('.')[2]]
+
+    def put(self, key, audio, extension):
+        """Writes a clip atomically, evicts to stay under max_bytes, and returns (path, mimetype)."""
+        filename = f"{key}.{extension}"
+        path = os.path.join(self.directory, filename)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        with self._lock:
+            previous = self._drop(key)
+            if previous is not None and previous[0] != filename:
+                self._remove_file(previous[0])
+            self._entries[key] = (filename, len(audio))
+            self._total_bytes += len(audio)
+            self.stats_counters['puts'] += 1
+            self._evict()
+        return path, MIMETYPES[extension]
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[1]
+        return entry
+
+    def _remove_file(self, filename):
+        try:
+            os.remove(os.path.join(self.directory, filename))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, _ = next(iter(self._entries.items()))
+            filename, _ = self._drop(key)
+            self._remove_file(filename)
+            self.stats_counters['evictions'] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.stats_counters, entries=len(self._entries), bytes=self._total_bytes, max_bytes=self.max_bytes)
@@ -0,0 +1,157 @@
+# tts_engines.py - Pluggable text-to-speech engines: gTTS (network) and espeak-ng (local/offline)
+import io
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+# Engines tried in this order; leave one out to disable it (e.g. TTS_ENGINE_ORDER=espeak-ng for offline use)
+TTS_ENGINE_ORDER = [e.strip() for e in os.environ.get('TTS_ENGINE_ORDER', 'gtts,espeak-ng').split(',') if e.strip()]
+# Seconds a network engine may take per request
+TTS_ENGINE_TIMEOUT = float(os.environ.get('TTS_ENGINE_TIMEOUT', '10'))
+# After a failure an engine is skipped for this long while another engine can speak the text
+TTS_ENGINE_COOLDOWN_SECONDS = float(os.environ.get('TTS_ENGINE_COOLDOWN_SECONDS', '60'))
+_ENGINE_FAILED_AT = {} # engine name -> time.monotonic() of its last failure
+_ENGINE_FAILED_LOCK = threading.Lock()
+
+
+class TTSEngine:
+    """Synthesizes one text in one voice; returns (audio_bytes, file_extension, mimetype)."""
+    name = None
+    local = False
+
+    def available(self):
+        return True
+
+    def synthesize(self, text, voice):
+        raise NotImplementedError
+
+
+class GTTSEngine(TTSEngine):
+    """Google Translate TTS over the network (MP3)."""
+    name = 'gtts'
+
+    def synthesize(self, text, voice):
+        from gtts import gTTS
+        fp = io.BytesIO()
+        gTTS(text=text, lang=voice, slow=False, timeout=TTS_ENGINE_TIMEOUT).write_to_fp(fp)
+        return fp.getvalue(), 'mp3', 'audio/mpeg'
+
+
+class EspeakEngine(TTSEngine):
+    """espeak-ng subprocess (WAV); offline, low latency, covers Assamese and Odia."""
+    name = 'espeak-ng'
+    local = True
+
+    def __init__(self):
+        self.binary = os.environ.get('ESPEAK_BINARY', 'espeak-ng')
+        self.speed = os.environ.get('ESPEAK_SPEED', '150')
+
+    def available(self):
+        return shutil.which(self.binary) is not None
+
+    def synthesize(self, text, voice):
+        result = subprocess.run(
+            [self.binary, '-v', voice, '-s', self.speed, '--stdin', '--stdout'],
+            input=text.encode('utf-8'),
+            capture_output=True,
+            check=True,
+            timeout=60,
+        )
+        if not result.stdout:
+            raise RuntimeError(f"espeak-ng produced no audio for voice '{voice}'")
+        return result.stdout, 'wav', 'audio/wav'
+
+
+ENGINES = {
+    engine.name: engine()
+    for engine in (GTTSEngine, EspeakEngine)
+}
+
+
+def usable_voices(voices):
+    """
+    Filters and orders a language's [(engine, voice), ...] by TTS_ENGINE_ORDER,
+    dropping engines that are disabled or not installed.
+    """
+    usable = [(name, voice) for name, voice in voices if name in TTS_ENGINE_ORDER and ENGINES.get(name) and ENGINES[name].available()]
+    return sorted(usable, key=lambda pair: TTS_ENGINE_ORDER.index(pair[0]))
+
+
+def cooling_down(name):
+    """True while an engine is within TTS_ENGINE_COOLDOWN_SECONDS of its last failure."""
+    with _ENGINE_FAILED_LOCK:
+        failed_at = _ENGINE_FAILED_AT.get(name)
+    return failed_at is not None and time.monotonic() - failed_at < TTS_ENGINE_COOLDOWN_SECONDS
+
+
+def synthesize(text, voices):
+    """
+    Tries each usable (engine, voice) in order until one succeeds. Engines that
+    failed recently are skipped unless no other engine is left to try.
+    Returns:
+        tuple: (audio_bytes, file_extension, mimetype, engine_name)
+    Raises:
+        RuntimeError: If no engine could synthesize the text.
+    """
+    candidates = usable_voices(voices)
+    ready = [(name, voice) for name, voice in candidates if not cooling_down(name)]
+    errors = []
+    for name, voice in ready or candidates:
+        try:
+            audio, extension, mimetype = ENGINES[name].synthesize(text, voice)
+            with _ENGINE_FAILED_LOCK:
+                _ENGINE_FAILED_AT.pop(name, None)
+            return audio, extension, mimetype, name
+        except Exception as e:
+            logging.warning(f"TTS engine '{name}' failed for voice '{voice}': {e}")
+            with _ENGINE_FAILED_LOCK:
+                _ENGINE_FAILED_AT[name] = time.monotonic()
+            errors.append(f"{name}: {e}")
+    raise RuntimeError("; ".join(errors) or "No TTS engine available for this language")
+
+
+# NLLB code -> 'lang' (the code clients send to /tts) and the (engine, voice) pairs that can
+# speak it; usable_voices orders them by TTS_ENGINE_ORDER and skips engines that are not installed.
+MASTER_TTS_CONFIG = {
+    "asm_Beng": {"lang": "as", "voices": [("espeak-ng", "as")]},
+    "ben_Beng": {"lang": "bn", "voices": [("gtts", "bn"), ("espeak-ng", "bn")]},
+    "guj_Gujr": {"lang": "gu", "voices": [("gtts", "gu"), ("espeak-ng", "gu")]},
+    "hin_Deva": {"lang": "hi", "voices": [("gtts", "hi"), ("espeak-ng", "hi")]},
+    "kan_Knda": {"lang": "kn", "voices": [("gtts", "kn"), ("espeak-ng", "kn")]},
+    "mal_Mlym": {"lang": "ml", "voices": [("gtts", "ml"), ("espeak-ng", "ml")]},
+    "mar_Deva": {"lang": "mr", "voices": [("gtts", "mr"), ("espeak-ng", "mr")]},
+    "ory_Orya": {"lang": "or", "voices": [("espeak-ng", "or")]},
+    "pan_Guru": {"lang": "pa", "voices": [("gtts", "pa"), ("espeak-ng", "pa")]},
+    "tam_Taml": {"lang": "ta", "voices": [("gtts", "ta"), ("espeak-ng", "ta")]},
+    "tel_Telu": {"lang": "te", "voices": [("gtts", "te"), ("espeak-ng", "te")]},
+    "urd_Arab": {"lang": "ur", "voices": [("gtts", "ur"), ("espeak-ng", "ur")]},
+    "eng_Latn": {"lang": "en", "voices": [("gtts", "en"), ("espeak-ng", "en")]},
+}
+TTS_VOICES_BY_LANG = {entry["lang"]: entry["voices"] for entry in MASTER_TTS_CONFIG.values()}
+# Resolved once at startup so requests and template renders do not probe for engine binaries
+USABLE_VOICES_BY_LANG = {
+    lang: voices
+    for lang, voices in ((lang, usable_voices(voices)) for lang, voices in TTS_VOICES_BY_LANG.items())
+    if voices
+}
+FALLBACK_TTS_LANG = 'en'
+
+
+def tts_code_for(nllb_code):
+    """The /tts lang code for an NLLB language, or None if no enabled engine can speak it."""
+    entry = MASTER_TTS_CONFIG.get(nllb_code) if nllb_code else None
+    if entry and entry["lang"] in USABLE_VOICES_BY_LANG:
+        return entry["lang"]
+    return None
+
+
+def resolve_tts_lang(lang):
+    """lang if an enabled engine can speak it, else FALLBACK_TTS_LANG if that can be spoken, else None."""
+    if lang in USABLE_VOICES_BY_LANG:
+        return lang
+    if FALLBACK_TTS_LANG in USABLE_VOICES_BY_LANG:
+        return FALLBACK_TTS_LANG
+    return None
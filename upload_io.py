@@ -0,0 +1,152 @@
+# upload_io.py - Hands uploads to OCR/STT from memory, spilling only large files to unique temp files
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+from metrics import time_stage
+
+# Uploads larger than this are written to a temp file instead of being decoded in memory
+UPLOAD_SPILL_BYTES = int(os.environ.get('UPLOAD_SPILL_BYTES', str(8 * 1024 * 1024)))
+UPLOAD_SPILL_DIR = os.environ.get('UPLOAD_SPILL_DIR') or None # None: the system temp dir
+# Containers whose index may sit at the end of the file; ffmpeg cannot read those from a pipe
+SEEKABLE_AUDIO_EXTENSIONS = {'m4a', 'mp4', 'mov'}
+
+
+def exif_orientation(data):
+    """
+    EXIF Orientation (1-8) of encoded JPEG bytes, read from the APP1 segment.
+    Returns:
+        int: The orientation, or 1 (upright) if there is none.
+    """
+    if data[:2] != b'\xff\xd8':
+        return 1
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return 1
+        marker = data[i + 1]
+        if marker in (0xD9, 0xDA):  # EOI / start of scan: no EXIF before the image data
+            return 1
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # Segments without a length
+            i += 2
+            continue
+        length = int.from_bytes(data[i + 2:i + 4], 'big')
+        if marker == 0xE1 and data[i + 4:i + 10] == b'Exif\x00\x00':
+            return _tiff_orientation(data[i + 10:i + 2 + length])
+        i += 2 + length
+    return 1
+
+
+def _tiff_orientation(tiff):
+    byteorder = {b'II': 'little', b'MM': 'big'}.get(tiff[:2])
+    if byteorder is None or len(tiff) < 8:
+        return 1
+    ifd = int.from_bytes(tiff[4:8], byteorder)
+    count = int.from_bytes(tiff[ifd:ifd + 2], byteorder)
+    for n in range(count):
+        entry = ifd + 2 + 12 * n
+        if entry + 12 > len(tiff):
+            break
+        if int.from_bytes(tiff[entry:entry + 2], byteorder) == 0x0112:
+            orientation = int.from_bytes(tiff[entry + 8:entry + 10], byteorder)
+            return orientation if 1 <= orientation <= 8 else 1
+    return 1
+
+
+def apply_orientation(image, orientation):
+    """Rotates/flips an (H, W[, C]) array stored with the given EXIF orientation so it displays upright."""
+    if orientation == 2:
+        image = np.fliplr(image)
+    elif orientation == 3:
+        image = np.rot90(image, 2)
+    elif orientation == 4:
+        image = np.flipud(image)
+    elif orientation == 5:
+        image = np.swapaxes(image, 0, 1)
+    elif orientation == 6:
+        image = np.rot90(image, -1)
+    elif orientation == 7:
+        image = np.rot90(np.swapaxes(image, 0, 1), 2)
+    elif orientation == 8:
+        image = np.rot90(image, 1)
+    else:
+        return image
+    return np.ascontiguousarray(image)
+
+
+def decode_image(data):
+    """
+    Decodes encoded image bytes into an upright RGB uint8 array, which EasyOCR reads
+    directly. Whether cv2.imdecode honours EXIF orientation differs between OpenCV
+    versions, so it is told to ignore it and the orientation is applied here.
+    Raises:
+        ValueError: If the bytes are not a decodable image.
+    """
+    import cv2
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+    if image is None:
+        raise ValueError("Could not decode image upload.")
+    return apply_orientation(cv2.cvtColor(image, cv2.COLOR_BGR2RGB), exif_orientation(data))
+
+
+def _upload_size(upload):
+    if isinstance(upload, (bytes, bytearray)):
+        return len(upload)
+    stream = upload.stream
+    position = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+def _extension(filename):
+    return filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+
+
+@contextmanager
+def upload_source(upload, input_type, filename=None):
+    """
+    Yields what perform_ocr / perform_stt should read for an upload: a decoded
+    RGB array for images, raw bytes for audio (piped to ffmpeg), or - above
+    UPLOAD_SPILL_BYTES - the path of a unique temp file removed on exit.
+    Args:
+        upload: Werkzeug FileStorage or the upload's bytes.
+        input_type (str): 'image' or 'audio'.
+        filename (str): Original filename, used for the temp-file suffix.
+    """
+    filename = filename or getattr(upload, 'filename', None) or ''
+    extension = _extension(filename)
+    spill = _upload_size(upload) > UPLOAD_SPILL_BYTES or (input_type == 'audio' and extension in SEEKABLE_AUDIO_EXTENSIONS)
+
+    if not spill:
+        with time_stage('upload_decode'):
+            data = upload if isinstance(upload, (bytes, bytearray)) else upload.read()
+            source = decode_image(data) if input_type == 'image' else bytes(data)
+        yield source
+        return
+
+    fd, path = tempfile.mkstemp(suffix=f".{extension}" if extension else '', prefix='upload_', dir=UPLOAD_SPILL_DIR)
+    try:
+        with time_stage('upload_save'), os.fdopen(fd, 'wb') as f:
+            if isinstance(upload, (bytes, bytearray)):
+                f.write(upload)
+            else:
+                upload.save(f)
+        logging.debug(f"Spilled {input_type} upload '{filename}' to {path}")
+        yield path
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def describe_source(source):
+    """Short label for log lines: the path, or the in-memory buffer's shape/size."""
+    if isinstance(source, str):
+        return source
+    if isinstance(source, np.ndarray):
+        return f"<array {'x'.join(str(n) for n in source.shape)}>"
+    return f"<{len(source)} bytes>"
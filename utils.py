@@ -1,12 +1,17 @@
-import easyocr
-import whisper
-from transformers import pipeline, AutoModelForSeq2SeqLM, AutoTokenizer # Added AutoTokenizer
+# easyocr, whisper and transformers are imported where the models are loaded,
+# so importing utils stays cheap and scheme/history endpoints can serve immediately.
 import os
+import re
+import threading
+from concurrent.futures import Future
 from langdetect import detect
 import time # Added for retry logic in get_translation_pipeline
 import http.client # Added for retry logic in get_translation_pipeline
 import warnings
 import logging
+import metrics
+from metrics import time_stage
+from upload_io import describe_source
 
 # Suppress FutureWarnings from torch.load
 warnings.filterwarnings('ignore', category=FutureWarning, module='whisper')
@@ -15,9 +20,74 @@ warnings.filterwarnings('ignore', category=FutureWarning, module='whisper')
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
 OCR_READER = None
-WHISPER_MODEL = None
+OCR_READERS = None # OCRReaderRegistry, one EasyOCR reader per script set
+EASYOCR_READER_BUDGET_MB = float(os.environ.get('EASYOCR_READER_BUDGET_MB', '1500'))
+EASYOCR_MAX_READERS = int(os.environ.get('EASYOCR_MAX_READERS', '4'))
+# Image preprocessing before OCR (see ocr_preprocess.py); text height / max side of 0 disable that step
+OCR_PREPROCESS = os.environ.get('OCR_PREPROCESS', '1') != '0'
+OCR_TARGET_TEXT_HEIGHT = int(os.environ.get('OCR_TARGET_TEXT_HEIGHT', '32'))
+OCR_MAX_SIDE = int(os.environ.get('OCR_MAX_SIDE', '2000'))
+OCR_GRAYSCALE = os.environ.get('OCR_GRAYSCALE', '1') != '0'
+OCR_BINARIZE = os.environ.get('OCR_BINARIZE', '0') == '1'
+OCR_CROP = os.environ.get('OCR_CROP', '0') == '1'
+# STT engine (see stt_engines.py): 'whisper' (openai-whisper) or 'faster-whisper' (int8 CTranslate2)
+STT_ENGINE_NAME = os.environ.get('STT_ENGINE', 'whisper')
+STT_MODEL_SIZE = os.environ.get('STT_MODEL_SIZE', 'base')
+STT_ENGINES = {} # {(engine_name, model_size): loaded STTEngine}
+_STT_ENGINE_LOCK = threading.Lock() # Guards STT_ENGINES and _STT_LOADING; never held while a model loads
+_STT_LOADING = {} # {(engine_name, model_size): threading.Event set when that load finishes}
+# Chunked STT for the whisper engine (see stt_pipeline.py): silence-gated windows decoded in batches
+STT_CHUNKED = os.environ.get('STT_CHUNKED', '1') != '0'
+STT_WINDOW_SECONDS = float(os.environ.get('STT_WINDOW_SECONDS', '30'))
+STT_BATCH_SIZE = int(os.environ.get('STT_BATCH_SIZE', '8'))
 TRANSLATION_PIPELINES = {} # Cache for pipelines {pipe_key: pipeline_object}
-TOKENIZERS = {} # Cache for tokenizers {model_name: tokenizer_object}
+TRANSLATION_MODEL_NAME = "facebook/nllb-200-distilled-600M"
+# Inference backend: 'torch' (fp32), 'torch-int8' (dynamic quantization) or 'ctranslate2'
+TRANSLATION_BACKEND_NAME = os.environ.get('TRANSLATION_BACKEND', 'torch')
+TRANSLATION_BACKEND = None # Single loaded NLLB backend shared by every language pair
+TRANSLATION_TOKENIZER = None
+_TRANSLATION_MODEL_LOCK = threading.Lock()
+
+# Micro-batching of concurrent translate_text calls (see translation_batcher.py)
+TRANSLATION_BATCHING_ENABLED = os.environ.get('TRANSLATION_BATCHING', '1') != '0'
+TRANSLATION_BATCH_MAX_SIZE = int(os.environ.get('TRANSLATION_BATCH_MAX_SIZE', '16'))
+TRANSLATION_BATCH_MAX_WAIT_MS = float(os.environ.get('TRANSLATION_BATCH_MAX_WAIT_MS', '10'))
+TRANSLATION_BATCHER = None
+_TRANSLATION_BATCHER_LOCK = threading.Lock()
+
+# Model loading, applied when the server starts serving: 'background' (default) serves requests at
+# once and warms models up on a daemon thread, 'eager' loads every model before the first request
+# is handled, 'lazy' loads each on first use.
+MODEL_LOADING = os.environ.get('MODEL_LOADING', 'background')
+MODEL_LOAD_SECONDS = {} # {engine: seconds spent loading}
+_WARMUP_THREAD = None
+_EFFECTIVE_MODEL_LOADING = None # Mode initialize_models() actually used (e.g. forced eager for the inference pool)
+
+# Optional multi-process inference (see inference_pool.py); 0 workers keeps everything in-process
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', '0'))
+INFERENCE_POOL_TASKS = [t.strip() for t in os.environ.get('INFERENCE_POOL_TASKS', 'ocr,stt,translate').split(',') if t.strip()]
+INFERENCE_THREADS_PER_WORKER = int(os.environ.get('INFERENCE_THREADS_PER_WORKER', '1'))
+INFERENCE_POOL = None
+
+# Long inputs are split into sentences / token-bounded chunks before translation
+TRANSLATION_SEGMENT_MAX_TOKENS = int(os.environ.get('TRANSLATION_SEGMENT_MAX_TOKENS', '200'))
+# Sentence ends: Latin terminators followed by a capital or non-ASCII letter, Indic danda, or line breaks
+_SENTENCE_BOUNDARY = re.compile(r'((?<=[.!?])[ \t]+(?=[A-Z"\'(\[]|[^\x00-\x7F])|(?<=[\u0964\u0965])\s+|\s*\n\s*)')
+# A period after one of these (or after a single-letter initial) does not end the sentence
+_ABBREVIATION_END = re.compile(
+    r'(?:^|[\s(\["\'])(?:mr|mrs|ms|dr|prof|sr|jr|st|smt|shri|govt|dept|no|vs|etc|approx|fig|e\.g|i\.e|[a-z])\.$',
+    re.IGNORECASE
+)
+
+# Translation cache (see translation_cache.py); the durable tier is attached by init_translation_cache
+TRANSLATION_CACHE_MEMORY_ENTRIES = int(os.environ.get('TRANSLATION_CACHE_MEMORY_ENTRIES', '4096'))
+TRANSLATION_CACHE_DB_ENTRIES = int(os.environ.get('TRANSLATION_CACHE_DB_ENTRIES', '200000'))
+TRANSLATION_CACHE = None
+
+# Scrape-time metrics read straight from the state above (see metrics.py)
+metrics.MODEL_LOAD_SECONDS.set_function(lambda: {(engine,): seconds for engine, seconds in MODEL_LOAD_SECONDS.items()})
+metrics.TRANSLATION_CACHE.set_function(lambda: _translation_cache_counts())
+metrics.register_queue('translation_batcher', lambda: TRANSLATION_BATCHER.queue_depth() if TRANSLATION_BATCHER is not None else 0)
 
 SUPPORTED_LANGUAGES = {
     # Friendly Name : NLLB Code
@@ -40,7 +110,7 @@ NLLB_SOURCE_LANG_CODES = {
     "hi": "hin_Deva"
 }
 
-# This map seems unused in the current code, but keeping it just in case
+# Any script OCR can read is a valid translation source (see ocr_readers.OCR_SCRIPT_SETS)
 ISO_TO_NLLB = {
     'as': 'asm_Beng',
     'bn': 'ben_Beng',
@@ -57,40 +127,208 @@ ISO_TO_NLLB = {
     'en': 'eng_Latn',
 }
 
-def initialize_models():
-    global OCR_READER, WHISPER_MODEL
-    logging.info("Initializing EasyOCR reader...")
-    OCR_READER = easyocr.Reader(['en', 'hi'], gpu=False)
-    logging.info("EasyOCR reader initialized.")
+def _load_default_ocr_reader():
+    global OCR_READER
+    if OCR_READER is None:
+        logging.info("Initializing EasyOCR reader...")
+        OCR_READER = get_ocr_reader_registry().get('en')
+        logging.info("EasyOCR reader initialized.")
+    return OCR_READER
+
+def get_stt_engine(engine_name=None, model_size=None, wait=True):
+    """
+    Loads (once) and returns the STT engine for the given name and model size.
+    The load runs outside _STT_ENGINE_LOCK, so requests for models that are
+    already loaded never wait behind it; concurrent callers of the same model
+    wait for the one load. With wait=False a missing model is loaded on a
+    background thread and None is returned.
+    """
+    key = (engine_name or STT_ENGINE_NAME, model_size or STT_MODEL_SIZE)
+    with _STT_ENGINE_LOCK:
+        engine = STT_ENGINES.get(key)
+        if engine is not None:
+            return engine
+        loading = _STT_LOADING.get(key)
+        is_loader = loading is None
+        if is_loader:
+            loading = _STT_LOADING[key] = threading.Event()
+
+    if not is_loader:
+        if not wait:
+            return None
+        loading.wait()
+        with _STT_ENGINE_LOCK:
+            engine = STT_ENGINES.get(key)
+        if engine is None:
+            raise RuntimeError(f"STT engine '{key[0]}' ({key[1]}) failed to load.")
+        return engine
+
+    if not wait:
+        def _load_in_background():
+            try:
+                _load_stt_engine(key, loading)
+            except Exception:
+                pass  # Already logged; the next request retries the load
+
+        threading.Thread(target=_load_in_background, name=f"stt-load-{key[1]}", daemon=True).start()
+        return None
+    return _load_stt_engine(key, loading)
+
+def _load_stt_engine(key, loading):
+    """Loads one STT engine and publishes it; always releases waiters on `loading`."""
+    try:
+        from stt_engines import create_engine
+        logging.info(f"Loading STT engine '{key[0]}' ({key[1]})...")
+        started = time.perf_counter()
+        engine = create_engine(
+            key[0],
+            key[1],
+            chunked=STT_CHUNKED,
+            batch_size=STT_BATCH_SIZE,
+            window_seconds=STT_WINDOW_SECONDS,
+        )
+        engine.load()
+        MODEL_LOAD_SECONDS['stt'] = time.perf_counter() - started
+        with _STT_ENGINE_LOCK:
+            STT_ENGINES[key] = engine
+        logging.info("STT engine loaded.")
+        return engine
+    except Exception as e:
+        logging.error(f"Loading STT engine '{key[0]}' ({key[1]}) failed: {e}")
+        raise
+    finally:
+        with _STT_ENGINE_LOCK:
+            _STT_LOADING.pop(key, None)
+        loading.set()
+
+def _loaded_stt_engine(engine_name):
+    """An already-loaded engine of this kind (the default size first), or None."""
+    with _STT_ENGINE_LOCK:
+        engine = STT_ENGINES.get((engine_name, STT_MODEL_SIZE))
+        if engine is None:
+            engine = next((engine for (name, _), engine in STT_ENGINES.items() if name == engine_name), None)
+    return engine
+
+def _warm_up_models():
+    for engine, loader in (('translation', load_translation_model), ('ocr', _load_default_ocr_reader), ('stt', get_stt_engine)):
+        try:
+            loader()
+        except Exception as e:
+            logging.error(f"Warm-up of {engine} model failed: {e}")
 
-    logging.info("Loading Whisper model (base)...")
-    WHISPER_MODEL = whisper.load_model("base")
-    logging.info("Whisper model loaded.")
+def initialize_models(mode=None):
+    """
+    Loads OCR, STT and translation models according to the loading mode.
+    'eager' loads everything now, 'background' starts a warm-up thread and
+    returns immediately, 'lazy' loads nothing until a request needs it.
+    """
+    global _WARMUP_THREAD, _EFFECTIVE_MODEL_LOADING
+    mode = mode or MODEL_LOADING
+    _EFFECTIVE_MODEL_LOADING = mode
+    if mode == 'lazy':
+        logging.info("Lazy model loading: models load on first use.")
+        return
+    if mode == 'background':
+        if _WARMUP_THREAD is None:
+            _WARMUP_THREAD = threading.Thread(target=_warm_up_models, name="model-warmup", daemon=True)
+            _WARMUP_THREAD.start()
+            logging.info("Model warm-up started in the background.")
+        return
+
+    _load_default_ocr_reader()
+    get_stt_engine()
+    # Load the shared translation model up front so the first request to any pair is cheap.
+    load_translation_model()
+
+def get_model_status():
+    """Reports which engines are loaded, for the readiness endpoint."""
+    with _STT_ENGINE_LOCK:
+        stt_keys = list(STT_ENGINES)
+    return {
+        'mode': _EFFECTIVE_MODEL_LOADING or MODEL_LOADING,
+        'configured_mode': MODEL_LOADING,
+        'translation_backend': TRANSLATION_BACKEND_NAME,
+        'stt_engines': [f"{name}:{size}" for name, size in stt_keys],
+        'warming_up': _WARMUP_THREAD is not None and _WARMUP_THREAD.is_alive(),
+        'engines': {
+            'ocr': OCR_READERS is not None and bool(OCR_READERS.loaded()),
+            'stt': bool(stt_keys),
+            'translation': TRANSLATION_BACKEND is not None,
+        },
+        'ocr_readers': OCR_READERS.loaded() if OCR_READERS is not None else {},
+        'load_seconds': {engine: round(seconds, 2) for engine, seconds in MODEL_LOAD_SECONDS.items()},
+    }
+
+def start_inference_pool(workers=None, tasks=None, threads_per_worker=None):
+    """
+    Forks the inference worker pool. Call after initialize_models() and before
+    any other background threads start, so every worker inherits loaded weights.
+    """
+    global INFERENCE_POOL
+    workers = INFERENCE_WORKERS if workers is None else workers
+    if workers <= 0 or INFERENCE_POOL is not None:
+        return INFERENCE_POOL
+    from inference_pool import InferencePool
+    INFERENCE_POOL = InferencePool(
+        workers,
+        tasks=INFERENCE_POOL_TASKS if tasks is None else tasks,
+        threads_per_worker=INFERENCE_THREADS_PER_WORKER if threads_per_worker is None else threads_per_worker,
+    )
+    return INFERENCE_POOL
+
+def _create_easyocr_reader(langs):
+    import easyocr
+    started = time.perf_counter()
+    reader = easyocr.Reader(langs, gpu=False)
+    MODEL_LOAD_SECONDS['ocr'] = time.perf_counter() - started
+    return reader
+
+def get_ocr_reader_registry():
+    """Returns the process-wide EasyOCR reader registry."""
+    global OCR_READERS
+    if OCR_READERS is None:
+        from ocr_readers import OCRReaderRegistry
+        OCR_READERS = OCRReaderRegistry(
+            _create_easyocr_reader,
+            budget_mb=EASYOCR_READER_BUDGET_MB,
+            max_readers=EASYOCR_MAX_READERS,
+        )
+    return OCR_READERS
 
 def get_easyocr_reader(lang_code):
-    """Get EasyOCR reader for specific language scripts."""
-    supported_scripts = ['en', 'hi', 'mr', 'ne']
-    if lang_code in ['ta', 'te', 'kn', 'ml', 'bn', 'as', 'gu', 'pa', 'ur', 'or']:
-        langs_to_load = [lang_code, 'en']
-        logging.debug(f"Initializing EasyOCR for specific script: {langs_to_load}")
-        return easyocr.Reader(langs_to_load, gpu=False)
-    else:
-        logging.debug(f"Initializing EasyOCR for default scripts: {supported_scripts}")
-        return easyocr.Reader(supported_scripts, gpu=False)
+    """Get a cached EasyOCR reader for the script set that covers lang_code."""
+    return get_ocr_reader_registry().get(lang_code or 'en')
+
 
+def perform_ocr(image, lang_code='en'):
+    """
+    Perform OCR on an image and detect language. lang_code selects the script set to read.
+    image is a file path or a decoded RGB array (see upload_io.upload_source).
+    """
+    if INFERENCE_POOL is not None and INFERENCE_POOL.handles('ocr'):
+        return INFERENCE_POOL.run('ocr', image, lang_code)
 
-def perform_ocr(image_path, lang_code='en'):
-    """Perform OCR on image and detect language."""
-    logging.debug(f"Performing OCR on: {image_path} (Hint: {lang_code})")
+    logging.debug(f"Performing OCR on: {describe_source(image)} (Hint: {lang_code})")
     
-    if OCR_READER is None:
-        logging.error("Global EasyOCR reader not initialized!")
-        reader = easyocr.Reader(['en','hi'], gpu=False)
-    else:
-        reader = OCR_READER
+    if OCR_PREPROCESS:
+        try:
+            from ocr_preprocess import preprocess_image
+            with time_stage('ocr_preprocess'):
+                image, _ = preprocess_image(
+                    image,
+                    target_text_height=OCR_TARGET_TEXT_HEIGHT,
+                    max_side=OCR_MAX_SIDE,
+                    grayscale=OCR_GRAYSCALE,
+                    binarize=OCR_BINARIZE,
+                    crop=OCR_CROP,
+                )
+        except Exception as prep_err:
+            logging.warning(f"OCR preprocessing failed, reading the original image: {prep_err}")
 
     try:
-        result = reader.readtext(image_path, detail=0, paragraph=True)
+        reader = get_easyocr_reader(lang_code)
+        with time_stage('ocr'):
+            result = reader.readtext(image, detail=0, paragraph=True)
         # Handle both string results and list results from EasyOCR
         if isinstance(result, list):
             text = " ".join(str(item) for item in result)
@@ -104,7 +342,8 @@ def perform_ocr(image_path, lang_code='en'):
     detected_lang = 'en'
     if text:
         try:
-            detected_lang = detect(text)
+            with time_stage('language_detect'):
+                detected_lang = detect(text)
             logging.debug(f"Langdetect on OCR text: {detected_lang}")
         except Exception as detect_err:
             logging.warning(f"Langdetect failed on OCR text: {detect_err}, defaulting to 'en'.")
@@ -114,117 +353,401 @@ def perform_ocr(image_path, lang_code='en'):
 
     return text, detected_lang
 
-def perform_stt(audio_path, lang_code_hint=None):
-    """Perform speech-to-text using Whisper model."""
-    global WHISPER_MODEL
-    if WHISPER_MODEL is None:
-        logging.error("Whisper model is None in perform_stt!")
-        raise Exception("Whisper model not initialized.")
+def perform_stt(audio, lang_code_hint=None, model_size=None, latency_budget_ms=None):
+    """
+    Perform speech-to-text with the configured STT engine.
+    audio is a file path or the encoded upload bytes and is decoded once. The
+    model size is model_size if given, else the largest size that fits
+    latency_budget_ms, else STT_MODEL_SIZE. The language is detected by the
+    engine unless lang_code_hint is given.
+    Returns:
+        tuple: (text, short_language_code), or (None, None) on failure.
+    """
+    if INFERENCE_POOL is not None and INFERENCE_POOL.handles('stt'):
+        return INFERENCE_POOL.run('stt', audio, lang_code_hint, model_size, latency_budget_ms)
+
     try:
-        logging.debug(f"Starting Whisper transcription for: {audio_path}")
-        if lang_code_hint:
-            logging.debug(f"Forcing Whisper language: {lang_code_hint}")
-            result = WHISPER_MODEL.transcribe(audio_path, fp16=False, language=lang_code_hint)
+        import stt_pipeline
+        from stt_engines import select_model_size
+        logging.debug(f"Starting transcription for: {describe_source(audio)}")
+        with time_stage('audio_decode'):
+            audio = stt_pipeline.decode_audio(audio)
+        if model_size:
+            engine = get_stt_engine(model_size=model_size)
         else:
-            result = WHISPER_MODEL.transcribe(audio_path, fp16=False)
-        text = result['text']
-        lang_short = result['language']
-        logging.debug(f"Whisper transcription successful. Lang='{lang_short}', Text='{text[:100]}...'")
+            model_size = select_model_size(STT_ENGINE_NAME, len(audio) / stt_pipeline.SAMPLE_RATE, latency_budget_ms, default=STT_MODEL_SIZE)
+            # A model load would blow the latency budget: use a loaded model now and load this size in the background
+            engine = get_stt_engine(model_size=model_size, wait=False) or _loaded_stt_engine(STT_ENGINE_NAME)
+            if engine is None:
+                engine = get_stt_engine(model_size=model_size)
+            model_size = engine.model_size
+        with time_stage('stt'):
+            text, lang_short = engine.transcribe(audio, language_hint=lang_code_hint)
+        logging.debug(f"Transcription successful ({engine.name}:{model_size}). Lang='{lang_short}', Text='{text[:100]}...'")
         return text, lang_short
     except Exception as e:
         logging.error(f"Error during STT transcription: {e}")
         import traceback
         traceback.print_exc()
         return None, None
+
 def detect_language(text):
     """Detect language of input text."""
     if not text:
         return "unknown"
     try:
-        lang = detect(text)
+        with time_stage('language_detect'):
+            lang = detect(text)
         logging.debug(f"Langdetect on input text: {lang}")
         return lang
     except Exception as e:
         logging.warning(f"Langdetect failed: {e}, returning 'unknown'.")
         return "unknown"
 
-def get_translation_pipeline(source_lang_code, target_lang_code):
-    """Loads or retrieves a cached translation pipeline and tokenizer."""
-    global TRANSLATION_PIPELINES, TOKENIZERS
-    pipe_key = f"{source_lang_code}_to_{target_lang_code}"
+def _resolve_translation_model_path():
+    """Prefer the local safetensors checkout, fall back to the Hugging Face hub id."""
+    local_model_dir = os.path.join("models", "facebook", "nllb-200-distilled-600M")
+    if os.path.isdir(local_model_dir) and os.path.exists(os.path.join(local_model_dir, "model.safetensors")):
+        logging.info(f"Found local model directory with safetensors: {local_model_dir}")
+        return local_model_dir
+    logging.info(f"Local safetensors not found, using Hugging Face model: {TRANSLATION_MODEL_NAME}")
+    return TRANSLATION_MODEL_NAME
 
-    if pipe_key not in TRANSLATION_PIPELINES:
-        logging.info(f"Translation pipeline cache miss for: {pipe_key}. Attempting to load.")
-        retries = 3
-        model = None
-        tokenizer = None
 
+def load_translation_model():
+    """
+    Loads the shared NLLB model and tokenizer exactly once, on the backend
+    selected by TRANSLATION_BACKEND (see translation_backends.py).
+    Every language pair reuses these objects, so memory stays flat
+    regardless of how many pairs are served.
+    Returns:
+        tuple: (backend, tokenizer), or (None, None) if loading failed.
+    """
+    global TRANSLATION_BACKEND, TRANSLATION_TOKENIZER
+    if TRANSLATION_BACKEND is not None:
+        return TRANSLATION_BACKEND, TRANSLATION_TOKENIZER
+
+    with _TRANSLATION_MODEL_LOCK:
+        if TRANSLATION_BACKEND is not None:
+            return TRANSLATION_BACKEND, TRANSLATION_TOKENIZER
+
+        from translation_backends import create_backend
+
+        retries = 3
         for attempt in range(retries):
             try:
-                local_model_dir = os.path.join("models", "facebook", "nllb-200-distilled-600M")
-
-                if os.path.isdir(local_model_dir) and os.path.exists(os.path.join(local_model_dir, "model.safetensors")):
-                    model_name_or_path = local_model_dir
-                    logging.info(f"Found local model directory with safetensors: {model_name_or_path}")
-                else:
-                    model_name_or_path = "facebook/nllb-200-distilled-600M"
-                    logging.info(f"Local safetensors not found, using Hugging Face model: {model_name_or_path}")
-
-                if model_name_or_path not in TOKENIZERS:
-                     logging.info(f"Loading tokenizer for: {model_name_or_path}")
-                     TOKENIZERS[model_name_or_path] = AutoTokenizer.from_pretrained(
-                         model_name_or_path, src_lang=source_lang_code, token=False
-                     )
-                     logging.info("Tokenizer loaded and cached.")
-                tokenizer = TOKENIZERS[model_name_or_path]
-
-                # Monkey-patch transformers to bypass PyTorch 2.6 CVE block for legacy .bin models
-                import transformers.utils.import_utils  # type: ignore
-                if hasattr(transformers.utils.import_utils, "check_torch_load_is_safe"):
-                    transformers.utils.import_utils.check_torch_load_is_safe = lambda: None
-
-                logging.info(f"Loading model: {model_name_or_path}")
-                model = AutoModelForSeq2SeqLM.from_pretrained(
-                    model_name_or_path, 
-                    use_safetensors=False,
-                    device_map={"": "cpu"}
-                )
-                logging.info("Model loaded.")
-
-                logging.info(f"Creating translation pipeline: {source_lang_code} -> {target_lang_code}")
-                translator = pipeline(
-                    'translation',
-                    model=model,
-                    tokenizer=tokenizer,
-                    src_lang=source_lang_code,
-                    tgt_lang=target_lang_code,
-                    max_length=512,
-                    # device=-1 # Force CPU fallback regardless of accelerate logic
-                )
-                TRANSLATION_PIPELINES[pipe_key] = translator
-                logging.info(f"Pipeline created and cached for {pipe_key}.")
+                model_name_or_path = _resolve_translation_model_path()
+                started = time.perf_counter()
+
+                logging.info(f"Loading translation backend '{TRANSLATION_BACKEND_NAME}' for: {model_name_or_path}")
+                backend = create_backend(TRANSLATION_BACKEND_NAME, model_name_or_path)
+                backend.load()
+                TRANSLATION_TOKENIZER = backend.tokenizer
+                TRANSLATION_BACKEND = backend
+                MODEL_LOAD_SECONDS['translation'] = time.perf_counter() - started
+                logging.info("Shared translation model loaded.")
                 break
 
             except http.client.RemoteDisconnected as rd_err:
                 logging.warning(f"RemoteDisconnected error (Attempt {attempt + 1}/{retries}): {rd_err}. Retrying in 2 seconds...")
                 time.sleep(2)
                 if attempt == retries - 1:
-                     logging.error(f"Failed to load pipeline after {retries} attempts due to RemoteDisconnected.")
-                     TRANSLATION_PIPELINES[pipe_key] = None
+                    logging.error(f"Failed to load translation model after {retries} attempts due to RemoteDisconnected.")
 
             except Exception as e:
-                logging.error(f"Error loading translation pipeline {pipe_key} (Attempt {attempt + 1}): {e}")
+                logging.error(f"Error loading translation model (Attempt {attempt + 1}): {e}")
                 import traceback
                 traceback.print_exc()
-                TRANSLATION_PIPELINES[pipe_key] = None
                 break
 
+    return TRANSLATION_BACKEND, TRANSLATION_TOKENIZER
+
+
+def generate_translations(texts, source_lang_code, target_lang_code, max_length=512):
+    """
+    Translates a list of texts with the shared model in one batched call.
+    The language pair is selected per call: the tokenizer's src_lang picks the
+    source language tag and the forced BOS token picks the target language.
+    Args:
+        texts (list[str]): Texts to translate.
+        source_lang_code (str): NLLB source code ('eng_Latn').
+        target_lang_code (str): NLLB target code ('hin_Deva').
+    Returns:
+        list[str]: Translations in the same order as texts.
+    """
+    backend, tokenizer = load_translation_model()
+    if backend is None or tokenizer is None:
+        raise Exception("Shared translation model is not available.")
+    return backend.translate(texts, source_lang_code, target_lang_code, max_length=max_length)
+
+
+class SharedModelTranslator:
+    """Pipeline-compatible callable bound to one language pair of the shared model."""
+
+    def __init__(self, source_lang_code, target_lang_code, max_length=512):
+        self.source_lang_code = source_lang_code
+        self.target_lang_code = target_lang_code
+        self.max_length = max_length
+
+    def __call__(self, texts):
+        # Like a transformers translation pipeline, a single string still returns a one-item list
+        batch = [texts] if isinstance(texts, str) else list(texts)
+        translations = generate_translations(batch, self.source_lang_code, self.target_lang_code, self.max_length)
+        return [{'translation_text': t} for t in translations]
+
+    def __repr__(self):
+        return f"<SharedModelTranslator {self.source_lang_code} -> {self.target_lang_code}>"
+
+
+def get_translation_pipeline(source_lang_code, target_lang_code):
+    """Returns a cached translator for the pair, backed by the single shared model."""
+    global TRANSLATION_PIPELINES
+    pipe_key = f"{source_lang_code}_to_{target_lang_code}"
+
+    if pipe_key in TRANSLATION_PIPELINES:
+        metrics.PIPELINE_CACHE.inc(result='hit')
+    else:
+        metrics.PIPELINE_CACHE.inc(result='miss')
+        logging.info(f"Translation pipeline cache miss for: {pipe_key}. Binding to shared model.")
+        backend, tokenizer = load_translation_model()
+        if backend is None or tokenizer is None:
+            # Not cached, so a later request can retry the load.
+            return None
+        TRANSLATION_PIPELINES[pipe_key] = SharedModelTranslator(source_lang_code, target_lang_code)
+        logging.info(f"Pipeline bound and cached for {pipe_key}.")
+
     return TRANSLATION_PIPELINES.get(pipe_key)
 
 
+def _translate_batch(texts, source_lang_code, target_lang_code):
+    """Batch function used by the batcher: one padded generate call for one pair."""
+    if INFERENCE_POOL is not None and INFERENCE_POOL.handles('translate'):
+        metrics.BATCH_SIZE.observe(len(texts))
+        with time_stage('inference'):
+            return INFERENCE_POOL.run('translate', texts, source_lang_code, target_lang_code)
+
+    with time_stage('pipeline_lookup'):
+        translator = get_translation_pipeline(source_lang_code, target_lang_code)
+    if translator is None:
+        raise Exception(f"Translator pipeline for {source_lang_code} -> {target_lang_code} is not available.")
+    metrics.BATCH_SIZE.observe(len(texts))
+    with time_stage('inference'):
+        results = translator(texts)
+    if not results or not isinstance(results, list) or len(results) != len(texts):
+        logging.warning(f"Translator pipeline returned empty or invalid results: {results}")
+        raise Exception("Translation pipeline returned empty or invalid result format.")
+    return [r.get('translation_text', '') for r in results]
+
+
+def get_translation_batcher():
+    """Returns the process-wide TranslationBatcher, starting it on first use."""
+    global TRANSLATION_BATCHER
+    if TRANSLATION_BATCHER is None:
+        with _TRANSLATION_BATCHER_LOCK:
+            if TRANSLATION_BATCHER is None:
+                from translation_batcher import TranslationBatcher
+                TRANSLATION_BATCHER = TranslationBatcher(
+                    _translate_batch,
+                    max_batch_size=TRANSLATION_BATCH_MAX_SIZE,
+                    max_wait_ms=TRANSLATION_BATCH_MAX_WAIT_MS,
+                    # With a process pool, run one batch per worker concurrently.
+                    dispatch_workers=INFERENCE_POOL.workers if INFERENCE_POOL is not None and INFERENCE_POOL.handles('translate') else 1,
+                )
+                logging.info(f"Translation batcher started (max_batch_size={TRANSLATION_BATCH_MAX_SIZE}, max_wait_ms={TRANSLATION_BATCH_MAX_WAIT_MS}).")
+    return TRANSLATION_BATCHER
+
+
+def init_translation_cache(db_path=None):
+    """Creates the translation cache, optionally backed by a SQLite database file."""
+    global TRANSLATION_CACHE
+    from translation_cache import TranslationCache
+    TRANSLATION_CACHE = TranslationCache(
+        db_path=db_path,
+        max_memory_entries=TRANSLATION_CACHE_MEMORY_ENTRIES,
+        max_db_entries=TRANSLATION_CACHE_DB_ENTRIES,
+    )
+    logging.info(f"Translation cache initialized (durable tier: {db_path or 'disabled'}).")
+    return TRANSLATION_CACHE
+
+
+def _translation_cache_counts():
+    if TRANSLATION_CACHE is None:
+        return {}
+    stats = TRANSLATION_CACHE.stats()
+    return {('memory_hit',): stats['memory_hits'], ('db_hit',): stats['db_hits'], ('miss',): stats['misses']}
+
+
+def get_translation_cache():
+    """Returns the translation cache, falling back to a memory-only cache if none was configured."""
+    if TRANSLATION_CACHE is None:
+        init_translation_cache()
+    return TRANSLATION_CACHE
+
+
+def resolve_source_language(text, source_lang_short):
+    """The short source code for text: source_lang_short, or the detected language for 'auto'."""
+    if source_lang_short == "auto":
+        detected_lang = detect_language(text)
+        return detected_lang if detected_lang != "unknown" else "en"
+    return source_lang_short
+
+
+def resolve_translation_codes(text, source_lang_short, target_lang_friendly_name):
+    """
+    Maps the short source code and friendly target name to NLLB codes.
+    Returns:
+        tuple: (nllb_source_code, nllb_target_code, error_message)
+    """
+    if not isinstance(source_lang_short, str):
+        return None, None, "Source language must be a short language code."
+    if not isinstance(target_lang_friendly_name, str):
+        return None, None, "Target language must be a language name."
+    source_lang_short = resolve_source_language(text, source_lang_short)
+
+    nllb_source_code = NLLB_SOURCE_LANG_CODES.get(source_lang_short)
+    if not nllb_source_code:
+        nllb_source_code = ISO_TO_NLLB.get(source_lang_short)
+    if not nllb_source_code:
+        return None, None, f"Source language short code '{source_lang_short}' not mapped to NLLB code."
+
+    nllb_target_code = SUPPORTED_LANGUAGES.get(target_lang_friendly_name)
+    if not nllb_target_code:
+        return None, None, f"Target language name '{target_lang_friendly_name}' not mapped to NLLB code."
+
+    return nllb_source_code, nllb_target_code, None
+
+
+def _count_tokens(text):
+    """Token length under the shared tokenizer, or a conservative estimate before it is loaded."""
+    if TRANSLATION_TOKENIZER is not None:
+        return len(TRANSLATION_TOKENIZER.tokenize(text))
+    return len(text.split()) * 2
+
+
+def _split_sentences(text):
+    """(sentence, separator) pairs, not splitting after abbreviations like "Mr." or initials."""
+    pieces = _SENTENCE_BOUNDARY.split(text)
+    # re.split with a capturing group alternates: sentence, separator, sentence, ...
+    sentences = []
+    for i in range(0, len(pieces), 2):
+        sentence, separator = pieces[i], pieces[i + 1] if i + 1 < len(pieces) else ''
+        previous = sentences[-1] if sentences else None
+        if previous and '\n' not in previous[1] and _ABBREVIATION_END.search(previous[0]):
+            sentences[-1] = (previous[0] + previous[1] + sentence, separator)
+        else:
+            sentences.append((sentence, separator))
+    return sentences
+
+
+def segment_text(text, max_tokens=None):
+    """
+    Splits text into segments of at most max_tokens: consecutive sentences on a
+    line are packed together, line breaks always start a new segment, and only a
+    sentence that is too long on its own is cut into word windows.
+    Returns:
+        list[tuple]: (segment, separator) pairs; joining segment + separator
+                     for every pair rebuilds the layout of the input.
+    """
+    max_tokens = max_tokens or TRANSLATION_SEGMENT_MAX_TOKENS
+    segments = []
+    packed_tokens = 0 # Tokens in segments[-1] if more sentences may still be packed into it, else None
+    for sentence, separator in _split_sentences(text.strip()):
+        if not sentence.strip():
+            if segments and separator:
+                segments[-1] = (segments[-1][0], segments[-1][1] + separator)
+                packed_tokens = None
+            continue
+        token_count = _count_tokens(sentence)
+        if token_count > max_tokens:
+            words = sentence.split()
+            words_per_chunk = max(1, int(len(words) * max_tokens / token_count))
+            chunks = [' '.join(words[i:i + words_per_chunk]) for i in range(0, len(words), words_per_chunk)]
+            for chunk in chunks[:-1]:
+                segments.append((chunk, ' '))
+            segments.append((chunks[-1], separator))
+            packed_tokens = None
+        elif segments and packed_tokens is not None and packed_tokens + token_count <= max_tokens:
+            previous, previous_separator = segments[-1]
+            segments[-1] = (previous + previous_separator + sentence, separator)
+            packed_tokens += token_count
+        else:
+            segments.append((sentence, separator))
+            packed_tokens = token_count
+        if '\n' in separator:
+            packed_tokens = None
+
+    return segments or [(text.strip(), '')]
+
+
+def _start_translation(text, nllb_source_code, nllb_target_code, cache, deferred=None):
+    """
+    Segments text and starts translating every segment that is not cached.
+    Without the batcher, segments are translated right away - or, if a deferred
+    dict is given, queued there per language pair for _run_deferred_translations.
+    Returns:
+        list[list]: [segment, separator, translated_text_or_future, was_cached] parts for _finish_translation.
+    """
+    segments = segment_text(text)
+    parts = []
+    misses = []
+    for segment, separator in segments:
+        cached = cache.get(segment, nllb_source_code, nllb_target_code) if len(segments) > 1 else None
+        parts.append([segment, separator, cached, cached is not None])
+        if cached is None:
+            misses.append(parts[-1])
+
+    if misses:
+        if TRANSLATION_BATCHING_ENABLED:
+            batcher = get_translation_batcher()
+            for part in misses:
+                part[2] = batcher.submit(part[0], nllb_source_code, nllb_target_code)
+        elif deferred is not None:
+            for part in misses:
+                part[2] = Future()
+                deferred.setdefault((nllb_source_code, nllb_target_code), []).append(part)
+        else:
+            translations = _translate_batch([part[0] for part in misses], nllb_source_code, nllb_target_code)
+            for part, translation in zip(misses, translations):
+                part[2] = translation
+    return parts
+
+
+def _run_deferred_translations(deferred):
+    """
+    Translates the segments _start_translation queued in deferred, one generate call
+    per language pair and TRANSLATION_BATCH_MAX_SIZE segments, resolving their futures.
+    """
+    for (nllb_source_code, nllb_target_code), group in deferred.items():
+        for start in range(0, len(group), TRANSLATION_BATCH_MAX_SIZE):
+            chunk = group[start:start + TRANSLATION_BATCH_MAX_SIZE]
+            try:
+                translations = _translate_batch([part[0] for part in chunk], nllb_source_code, nllb_target_code)
+            except Exception as e:
+                for part in chunk:
+                    part[2].set_exception(e)
+                continue
+            for part, translation in zip(chunk, translations):
+                part[2].set_result(translation)
+
+
+def _finish_translation(parts, nllb_source_code, nllb_target_code, cache):
+    """Waits for outstanding segments and reassembles them in their original order."""
+    pieces = []
+    for segment, separator, value, was_cached in parts:
+        translated = value.result() if isinstance(value, Future) else value
+        if not translated:
+            raise Exception("Translation pipeline returned empty or invalid result format.")
+        if len(parts) > 1 and not was_cached:
+            cache.put(segment, nllb_source_code, nllb_target_code, translated)
+        pieces.append(translated + separator)
+    return ''.join(pieces).strip()
+
+
 def translate_text(text, source_lang_short, target_lang_friendly_name):
     """
     Translates text using NLLB model.
+    Long input is split into sentences that are translated as one batch, and
+    requests are micro-batched with concurrent callers for the same language pair.
     Args:
         text (str): Text to translate.
         source_lang_short (str): Short language code ('en', 'hi').
@@ -237,37 +760,132 @@ def translate_text(text, source_lang_short, target_lang_friendly_name):
     if not text:
         return None, "No text provided for translation."
 
-    if source_lang_short == "auto":
-        detected_lang = detect_language(text)
-        source_lang_short = detected_lang if detected_lang != "unknown" else "en"
-
-    nllb_source_code = NLLB_SOURCE_LANG_CODES.get(source_lang_short)
-    if not nllb_source_code:
-        nllb_source_code = ISO_TO_NLLB.get(source_lang_short)
-    if not nllb_source_code:
-        return None, f"Source language short code '{source_lang_short}' not mapped to NLLB code."
-
-    nllb_target_code = SUPPORTED_LANGUAGES.get(target_lang_friendly_name)
-    if not nllb_target_code:
-        return None, f"Target language name '{target_lang_friendly_name}' not mapped to NLLB code."
+    nllb_source_code, nllb_target_code, code_error = resolve_translation_codes(text, source_lang_short, target_lang_friendly_name)
+    if code_error:
+        return None, code_error
 
     logging.debug(f"Translation request: {nllb_source_code} -> {nllb_target_code}, Text: '{text[:50]}...'")
 
+    cache = get_translation_cache()
+    cached = cache.get(text, nllb_source_code, nllb_target_code)
+    if cached is not None:
+        logging.debug("Translation cache hit.")
+        return cached, None
+
     try:
-        translator = get_translation_pipeline(nllb_source_code, nllb_target_code)
-        if translator is None:
-            raise Exception(f"Translator pipeline for {nllb_source_code} -> {nllb_target_code} is not available.")
-
-        logging.debug("Calling translator pipeline...")
-        results = translator(text)
-        if not results or not isinstance(results, list) or not results[0].get('translation_text'):
-             logging.warning("Translator pipeline returned empty or invalid results:", results)
-             raise Exception("Translation pipeline returned empty or invalid result format.")
-
-        translated_text = results[0]['translation_text']
-        logging.debug(f"Translation successful: '{translated_text[:100]}...'")
+        parts = _start_translation(text, nllb_source_code, nllb_target_code, cache)
+        translated_text = _finish_translation(parts, nllb_source_code, nllb_target_code, cache)
+
+        cache.put(text, nllb_source_code, nllb_target_code, translated_text)
+        logging.debug(f"Translation successful ({len(parts)} segment(s)): '{translated_text[:100]}...'")
         return translated_text, None
 
     except Exception as e:
         logging.error(f"Error during translation ({nllb_source_code} -> {nllb_target_code}): {e}")
-        return None, f"Translation failed: {e}"
\ No newline at end of file
+        return None, f"Translation failed: {e}"
+
+
+def translate_many(texts, source_lang_short, target_lang_friendly_names):
+    """
+    Translates many texts into many target languages in one go.
+    All (text, target) segments are submitted before any result is awaited, so the
+    model work is batched per language pair instead of run one string at a time.
+    Args:
+        texts (list[str]): Texts to translate.
+        source_lang_short (str): Short language code ('en', 'hi') or 'auto'.
+        target_lang_friendly_names (list[str]): Friendly target names ('Hindi', 'Tamil').
+    Returns:
+        dict: {target_friendly_name: [(translated_text, error_message), ...]} aligned with texts.
+    """
+    results = {name: [(None, None)] * len(texts) for name in target_lang_friendly_names}
+    cache = get_translation_cache()
+    jobs = []  # (target_name, index, nllb_source_code, nllb_target_code, parts)
+    # Without the batcher, segments are collected per language pair and translated in grouped calls
+    deferred = None if TRANSLATION_BATCHING_ENABLED else {}
+
+    # Detected once per text, not once per text and target
+    source_shorts = [
+        resolve_source_language(text, source_lang_short) if text and isinstance(source_lang_short, str) else source_lang_short
+        for text in texts
+    ]
+
+    for target_name in target_lang_friendly_names:
+        row = results[target_name] = list(results[target_name])
+        for index, text in enumerate(texts):
+            if not text:
+                row[index] = (None, "No text provided for translation.")
+                continue
+            nllb_source_code, nllb_target_code, code_error = resolve_translation_codes(text, source_shorts[index], target_name)
+            if code_error:
+                row[index] = (None, code_error)
+                continue
+            cached = cache.get(text, nllb_source_code, nllb_target_code)
+            if cached is not None:
+                row[index] = (cached, None)
+                continue
+            try:
+                parts = _start_translation(text, nllb_source_code, nllb_target_code, cache, deferred)
+            except Exception as e:
+                logging.error(f"Error during batch translation ({nllb_source_code} -> {nllb_target_code}): {e}")
+                row[index] = (None, f"Translation failed: {e}")
+                continue
+            jobs.append((target_name, index, nllb_source_code, nllb_target_code, parts))
+
+    if deferred:
+        _run_deferred_translations(deferred)
+
+    for target_name, index, nllb_source_code, nllb_target_code, parts in jobs:
+        try:
+            translated_text = _finish_translation(parts, nllb_source_code, nllb_target_code, cache)
+        except Exception as e:
+            logging.error(f"Error during batch translation ({nllb_source_code} -> {nllb_target_code}): {e}")
+            results[target_name][index] = (None, f"Translation failed: {e}")
+            continue
+        cache.put(texts[index], nllb_source_code, nllb_target_code, translated_text)
+        results[target_name][index] = (translated_text, None)
+
+    return results
+
+
+def iter_translation_segments(text, source_lang_short, target_lang_friendly_name):
+    """
+    Translates text segment by segment and yields each result as soon as it
+    (and everything before it) is ready. All segments are submitted up front so
+    they still share batched forward passes. A cached translation of the whole
+    text is yielded as one segment.
+    Yields:
+        dict: {'index', 'total', 'source', 'translation', 'separator'}
+    Raises:
+        ValueError: If the text is empty or the languages cannot be mapped.
+    """
+    if not text:
+        raise ValueError("No text provided for translation.")
+
+    nllb_source_code, nllb_target_code, code_error = resolve_translation_codes(text, source_lang_short, target_lang_friendly_name)
+    if code_error:
+        raise ValueError(code_error)
+
+    cache = get_translation_cache()
+    cached = cache.get(text, nllb_source_code, nllb_target_code)
+    if cached is not None:
+        logging.debug("Translation cache hit.")
+        # The whole translation is known, so it goes out as a single segment
+        yield {'index': 0, 'total': 1, 'source': text, 'translation': cached, 'separator': ''}
+        return
+
+    parts = _start_translation(text, nllb_source_code, nllb_target_code, cache)
+    translated_pieces = []
+    for index, part in enumerate(parts):
+        translated = _finish_translation([part], nllb_source_code, nllb_target_code, cache)
+        if len(parts) > 1 and not part[3]:
+            cache.put(part[0], nllb_source_code, nllb_target_code, translated)
+        translated_pieces.append(translated + part[1])
+        yield {
+            'index': index,
+            'total': len(parts),
+            'source': part[0],
+            'translation': translated,
+            'separator': part[1],
+        }
+
+    cache.put(text, nllb_source_code, nllb_target_code, ''.join(translated_pieces).strip())